@@ -0,0 +1,100 @@
+# Iterative depth-first engine shared by DLS, IDS and IDA*. A single packed
+# state is moved forward and undone in place; each depth level keeps only its
+# next move index, h value, move code and undo mask, so memory is O(depth)
+# and no visited set is shared between branches or iterations.
+from utils.puzzle_utils import pack, apply_move, is_solvable, board_of, to_result, BOARD
+from utils.heuristics import prepare
+from utils.search_control import CHECK_MASK
+
+INF = float('inf')
+
+def contour(s, g, bound, h0, deltas=None, evaluate=None, bd=BOARD, control=None, stats=None):
+    # One bounded depth-first pass from packed start s. Children are scored
+    # with deltas[blank][move][tile] when given, else evaluate(child), else 0.
+    # Returns (moves, bound): the blank moves to g when found with
+    # g + h <= bound, otherwise None and the smallest f that exceeded bound
+    # (INF when nothing was cut off).
+    if s == g:
+        return [], bound
+    if deltas is None and evaluate is None:
+        deltas = prepare(None, bd.goal)[0]
+    moves_of, bs, mask = bd.moves, bd.blank_shift, bd.mask
+    code = s
+    idx, hs, dirs, undo = [0], [h0], [], []
+    next_bound = INF
+    expanded, generated, max_depth = 1, 0, 0
+    track = stats is not None
+
+    try:
+        while idx:
+            moves = moves_of[code >> bs]
+            i = idx[-1]
+            if i == len(moves):
+                # every move tried: undo the move into this level
+                idx.pop(); hs.pop()
+                if dirs:
+                    dirs.pop()
+                    code ^= undo.pop()
+                continue
+            idx[-1] = i + 1
+            d, shift, mul, bx = moves[i]
+            if dirs and d == dirs[-1] ^ 1:
+                continue  # would undo the previous move
+            t = (code >> shift) & mask
+            x = t * mul ^ bx
+            child = code ^ x
+            generated += 1
+            if control is not None and not generated & CHECK_MASK:
+                control.tick(len(idx))
+            h = hs[-1] + deltas[code >> bs][d][t] if deltas is not None else evaluate(child)
+            f = len(idx) + h
+            if f > bound:
+                if f < next_bound:
+                    next_bound = f
+                continue
+            dirs.append(d)
+            if child == g:
+                return dirs, bound
+            code = child
+            undo.append(x); idx.append(0); hs.append(h)
+            expanded += 1
+            if track and len(idx) > max_depth:
+                max_depth = len(idx)
+    finally:
+        if track:
+            stats.add(expanded, generated, 0, 0, max_depth, 0)
+    return None, next_bound
+
+def moves_to_result(s, dirs, bd=BOARD):
+    # replay blank moves from packed start into (path, moves)
+    codes = [s]
+    for d in dirs:
+        codes.append(apply_move(codes[-1], d, bd))
+    return to_result(codes, dirs, bd)
+
+def iterative_deepening(start, goal, heuristic=None, max_bound=None, control=None, stats=None):
+    # IDA*: repeat contour() raising the bound to the smallest f that exceeded
+    # it. With no heuristic this is plain iterative deepening.
+    if stats is not None:
+        stats.phase('setup')
+    dirs = None
+    if is_solvable(start, goal):
+        bd = board_of(start)
+        s, g = pack(start), pack(goal)
+        deltas, evaluate = prepare(heuristic, goal)
+        h0 = heuristic(start, goal) if heuristic is not None else 0
+        bound = h0
+        if stats is not None:
+            stats.phase('search')
+        try:
+            while max_bound is None or bound <= max_bound:
+                dirs, bound = contour(s, g, bound, h0, deltas, evaluate, bd, control, stats)
+                if dirs is not None or bound == INF:
+                    break
+        finally:
+            if stats is not None:
+                stats.phase('reconstruct')
+    result = moves_to_result(s, dirs, bd) if dirs is not None else None
+    if stats is not None:
+        stats.done()
+    return result
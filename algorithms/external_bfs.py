@@ -0,0 +1,236 @@
+# External-memory BFS with delayed duplicate detection. Each BFS layer lives
+# on disk as one sorted file of fixed-width big-endian packed states, so byte
+# order is numeric order. Expanding layer d streams its file and collects the
+# children in a bounded buffer that is sorted, deduplicated and written out
+# as a run whenever it fills. The runs are then merged, and a child is kept
+# only if it is not in layer d or d-1 (on this bipartite graph a child of
+# layer d can only repeat a state of those two). No visited set is ever held
+# in memory, so RAM stays within `ram_budget` however large the state space
+# is; disk holds the layers (width bytes per state).
+#
+#   python -m algorithms.external_bfs 3 --ram 64     # depth histogram of the 8-puzzle
+import heapq
+import os
+import shutil
+import tempfile
+from utils.puzzle_utils import pack, board_of, is_solvable, apply_move, to_result
+from utils.search_control import CHECK_MASK
+
+RAM_BUDGET = 256 << 20  # bytes
+STATE_BYTES = 64        # rough RAM per buffered state: a Python int, its list slot and sort scratch
+CHUNK = 4096            # states per read or write of a run or layer file
+MAX_FANIN = 16          # runs merged at once; more take extra merge passes
+
+def width(bd):
+    # bytes per stored state: the tiles and the blank index
+    return (bd.blank_shift + bd.bits + 7) // 8
+
+def buffer_states(ram_budget, w):
+    # children buffered before a run is written, after the merge's read buffers
+    return max(CHUNK, (ram_budget - 2 * MAX_FANIN * CHUNK * w) // STATE_BYTES)
+
+def read_states(path, w):
+    # the states of a run or layer file, in file order
+    with open(path, 'rb') as f:
+        while True:
+            buf = f.read(w * CHUNK)
+            if not buf:
+                return
+            for i in range(0, len(buf), w):
+                yield int.from_bytes(buf[i:i + w], 'big')
+
+def write_states(path, codes, w):
+    # write an ascending stream of states; returns how many were written
+    count = 0
+    out = []
+    with open(path, 'wb') as f:
+        for code in codes:
+            out.append(code.to_bytes(w, 'big'))
+            if len(out) == CHUNK:
+                f.write(b''.join(out))
+                count += CHUNK
+                out.clear()
+        f.write(b''.join(out))
+    return count + len(out)
+
+def contains(path, code, w):
+    # binary search of a sorted layer file
+    target = code.to_bytes(w, 'big')
+    with open(path, 'rb') as f:
+        lo, hi = 0, os.path.getsize(path) // w
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(mid * w)
+            value = f.read(w)
+            if value == target:
+                return True
+            if value < target:
+                lo = mid + 1
+            else:
+                hi = mid
+    return False
+
+def _unique(codes):
+    last = None
+    for code in codes:
+        if code != last:
+            yield code
+            last = code
+
+def _difference(codes, exclude):
+    # sorted `codes` that are not in the sorted stream `exclude`
+    x = next(exclude, None)
+    for code in codes:
+        while x is not None and x < code:
+            x = next(exclude, None)
+        if code != x:
+            yield code
+
+def _merge_runs(runs, w, scratch):
+    # merge passes until at most MAX_FANIN runs remain; returns their paths
+    passes = 0
+    while len(runs) > MAX_FANIN:
+        merged = []
+        for i in range(0, len(runs), MAX_FANIN):
+            group = runs[i:i + MAX_FANIN]
+            path = os.path.join(scratch, f'merge_{passes}_{i}.bin')
+            write_states(path, _unique(heapq.merge(*(read_states(p, w) for p in group))), w)
+            for p in group:
+                os.remove(p)
+            merged.append(path)
+        runs, passes = merged, passes + 1
+    return runs
+
+def layer_path(work_dir, depth):
+    return os.path.join(work_dir, f'layer_{depth}.bin')
+
+def search(start, work_dir, target=None, ram_budget=RAM_BUDGET, keep_layers=False, control=None, stats=None):
+    # BFS from `start` (a flat tuple) until the packed `target` is reached or
+    # the component is exhausted, with layer files in `work_dir`. Returns
+    # (histogram, depth): states per depth, and the target's depth or None.
+    # Layers older than the two needed for duplicate detection are deleted
+    # unless `keep_layers` (path reconstruction reads them back).
+    bd = board_of(start)
+    w = width(bd)
+    moves, bs, mask = bd.moves, bd.blank_shift, bd.mask
+    cap = buffer_states(ram_budget, w)
+    s = pack(start)
+    write_states(layer_path(work_dir, 0), [s], w)
+    histogram = [1]
+    found = 0 if s == target else None
+    expanded = generated = max_frontier = 0
+
+    try:
+        while found is None and histogram[-1]:
+            depth = len(histogram) - 1
+            max_frontier = max(max_frontier, histogram[-1])
+            runs, buffer = [], []
+
+            def flush():
+                buffer.sort()
+                path = os.path.join(work_dir, f'run_{len(runs)}.bin')
+                write_states(path, _unique(buffer), w)
+                runs.append(path)
+                buffer.clear()
+
+            for code in read_states(layer_path(work_dir, depth), w):
+                expanded += 1
+                if control is not None and not expanded & CHECK_MASK:
+                    control.tick(histogram[-1])
+                for d, shift, mul, bx in moves[code >> bs]:
+                    buffer.append(code ^ ((code >> shift) & mask) * mul ^ bx)
+                if len(buffer) >= cap:
+                    generated += len(buffer)
+                    flush()
+            generated += len(buffer)
+            if buffer or not runs:
+                flush()
+
+            runs = _merge_runs(runs, w, work_dir)
+            previous = [read_states(layer_path(work_dir, d), w) for d in (depth, depth - 1) if d >= 0]
+            children = _unique(heapq.merge(*(read_states(p, w) for p in runs)))
+            histogram.append(write_states(layer_path(work_dir, depth + 1),
+                                          _difference(children, heapq.merge(*previous)), w))
+            for it in previous:
+                it.close()
+            for p in runs:
+                os.remove(p)
+            if not keep_layers and depth >= 1:
+                os.remove(layer_path(work_dir, depth - 1))
+            if target is not None and histogram[-1] and contains(layer_path(work_dir, depth + 1), target, w):
+                found = depth + 1
+    finally:
+        if stats is not None:
+            # no closed set is kept: max_closed stays 0
+            total = sum(histogram)
+            stats.add(expanded, generated, generated - total + 1, 0, max_frontier)
+    if not histogram[-1]:
+        histogram.pop()
+    return histogram, found
+
+def external_bfs(start, goal, work_dir=None, ram_budget=RAM_BUDGET, control=None, stats=None):
+    # optimal path by external BFS; each step back to the start is a neighbour
+    # found in the previous layer's file
+    if stats is not None:
+        stats.phase('setup')
+    if not is_solvable(start, goal):
+        if stats is not None:
+            stats.done()
+        return None
+    bd = board_of(start)
+    w = width(bd)
+    work_dir = tempfile.mkdtemp(prefix='external_bfs_', dir=work_dir)
+    try:
+        if stats is not None:
+            stats.phase('search')
+        try:
+            _, depth = search(start, work_dir, pack(goal), ram_budget, True, control, stats)
+        finally:
+            if stats is not None:
+                stats.phase('reconstruct')
+        code, codes, dirs = pack(goal), [], []
+        for d in range(depth, 0, -1):
+            codes.append(code)
+            path = layer_path(work_dir, d - 1)
+            for m, _ in bd.legal[code >> bd.blank_shift]:
+                parent = apply_move(code, m, bd)
+                if contains(path, parent, w):
+                    dirs.append(m ^ 1)
+                    code = parent
+                    break
+        codes.append(code)
+        codes.reverse(); dirs.reverse()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if stats is not None:
+        stats.done()
+    return to_result(codes, dirs, bd)
+
+def depth_histogram(start, work_dir=None, ram_budget=RAM_BUDGET, control=None, stats=None):
+    # number of states at each distance from `start`, over its whole component
+    work_dir = tempfile.mkdtemp(prefix='external_bfs_', dir=work_dir)
+    try:
+        return search(start, work_dir, None, ram_budget, False, control, stats)[0]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    from utils.puzzle_utils import board
+    from utils.search_stats import SearchStats
+    parser = argparse.ArgumentParser(description='Depth histogram of a sliding puzzle by external-memory BFS.')
+    parser.add_argument('n', type=int, nargs='?', default=3, help='board size (default 3)')
+    parser.add_argument('--start', help='comma separated start state (default: the goal)')
+    parser.add_argument('--ram', type=int, default=RAM_BUDGET >> 20, help='RAM budget in MB')
+    parser.add_argument('--dir', help='directory for the layer files (default: system temp)')
+    args = parser.parse_args()
+    start = tuple(int(t) for t in args.start.split(',')) if args.start else board(args.n).goal
+    stats = SearchStats()
+    t0 = time.perf_counter()
+    histogram = depth_histogram(start, args.dir, args.ram << 20, stats=stats)
+    for depth, count in enumerate(histogram):
+        print(f'{depth:4d} {count:14,d}')
+    print(f'{sum(histogram):,} states, max depth {len(histogram) - 1}, {time.perf_counter() - t0:.1f} s, '
+          f'runs of up to {buffer_states(args.ram << 20, width(board_of(start))):,} states')
+    print(stats.summary())
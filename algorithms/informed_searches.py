@@ -1,146 +1,664 @@
 import heapq
-from utils.puzzle_utils import neighbors, is_goal
-
-# heuristics map will be imported by UI
-def heuristic_misplaced(state, goal):
-    return sum(1 for a,b in zip(state, goal) if a!=0 and a!=b)
-
-def heuristic_manhattan(state, goal):
-    # index positions
-    def pos(index):
-        return (index//3, index%3)
-    goal_positions = {val: i for i,val in enumerate(goal)}
-    total = 0
-    for i, val in enumerate(state):
-        if val == 0:
-            continue
-        gi = goal_positions[val]
-        r1,c1 = pos(i)
-        r2,c2 = pos(gi)
-        total += abs(r1-r2)+abs(c1-c2)
-    return total
-
-heuristics_map = {
-    'misplaced': heuristic_misplaced,
-    'manhattan': heuristic_manhattan
-}
-
-def a_star(start, goal, heuristic):
+import os
+import queue
+from utils.puzzle_utils import pack, board_of, trace, to_result, is_solvable, apply_move
+from utils.distance_db import get_db
+from utils.heuristics import prepare, heuristics_map, name_of, misplaced, manhattan, pdb, exact
+from algorithms.depth_first import INF, contour, iterative_deepening
+from algorithms.uninformed_searches import reconstruct_bidirectional_path
+from utils.search_control import CHECK_MASK, Cancelled, BudgetExceeded
+from utils.open_list import open_list
+from utils.search_stats import SearchStats
+
+HDA_BATCH = 256   # children per message to another HDA* worker
+HDA_CHUNK = 512   # expansions between inbox checks
+
+# heuristics_map (utils.heuristics) is re-exported for the UI and CLIs. Entries
+# may be TileHeuristic objects, which the searches update incrementally,
+# objects with evaluator(goal) that score packed states, or plain callables
+# h(state, goal). The heuristic_* names are kept for existing callers.
+heuristic_misplaced = misplaced
+heuristic_manhattan = manhattan
+heuristic_pdb = pdb
+heuristic_exact = exact
+
+def _best_first(start, goal, heuristic=None, weight=1, control=None, stats=None, queue=None):
+    # A*-family search, f = g + weight * h, on the shared loop _expand().
+    # `queue` overrides the open list chosen by open_list().
+    if stats is not None:
+        stats.phase('setup')
+    s, goal_code = pack(start), pack(goal)
+    bd = board_of(start)
+    deltas, evaluate = prepare(heuristic, goal)
+    h0 = heuristic(start, goal) if heuristic is not None else 0
+    if not 0 <= weight < INF:
+        raise ValueError('weight must be finite and not negative')
+    if not is_solvable(start, goal):
+        # the whole component would be searched before giving up
+        if stats is not None:
+            stats.done()
+        return None
+    if weight == int(weight):
+        weight = int(weight)
+    open_set = queue() if queue is not None else open_list(weight, h0)
+    open_set.push(weight * h0, 0, s, h0)
+    nodes = {s: 0}
+    counts = [0] * 4
+    found = False
+    track = stats is not None
+
+    if track:
+        stats.phase('search')
+    try:
+        found = _expand(open_set, nodes, goal_code, bd, deltas, evaluate, weight, control, counts if track else None)
+    finally:
+        if track:
+            pops, stale, generated, max_frontier = counts
+            pushed = pops + len(open_set) - 1
+            stats.add(pops - stale - found, generated, generated - pushed, stale, max_frontier, len(nodes))
+            stats.phase('reconstruct')
+    result = to_result(*trace(nodes, s, goal_code, bd), bd) if found else None
+    if track:
+        stats.done()
+    return result
+
+def _expand(open_set, nodes, goal_code, bd, deltas, evaluate, weight=1, control=None, counts=None, max_stored=INF):
+    # The A*-family loop. Each node record packs g above the 2-bit move code:
+    # nodes[code] = g << 2 | move. Open-list entries carry h so children can be
+    # scored from their parent's value; entries whose g is worse than the
+    # node's record are stale and skipped when popped. Returns True once the
+    # goal is popped, False when the open list empties or `max_stored` states
+    # are recorded. counts, when given, receives [pops, stale, generated,
+    # max_frontier], also when a cancel or budget ends the loop.
+    moves, bs, mask = bd.moves, bd.blank_shift, bd.mask
+    push, pop = open_set.push, open_set.pop
+    pops = stale = generated = max_frontier = 0
+    track = counts is not None
+    try:
+        while open_set and len(nodes) < max_stored:
+            f, g, current, h = pop()
+            pops += 1
+            if control is not None and not pops & CHECK_MASK:
+                control.tick(len(open_set))
+            if g > nodes[current] >> 2:
+                stale += 1
+                continue
+            if current == goal_code:
+                return True
+            tentative_g = g + 1
+            b = current >> bs
+            children = moves[b]
+            generated += len(children)
+            for d, shift, mul, bx in children:
+                t = (current >> shift) & mask
+                child = current ^ t * mul ^ bx
+                rec = nodes.get(child)
+                if rec is None or tentative_g < rec >> 2:
+                    nodes[child] = tentative_g << 2 | d
+                    ch = h + deltas[b][d][t] if deltas is not None else evaluate(child)
+                    push(tentative_g + weight * ch, tentative_g, child, ch)
+            if track and len(open_set) > max_frontier:
+                max_frontier = len(open_set)
+        return False
+    finally:
+        if track:
+            counts[:] = pops, stale, generated, max_frontier
+
+def a_star(start, goal, heuristic, control=None, stats=None):
     # A* returns path and moves list, or None if no solution
-    open_set = []
-    heapq.heappush(open_set, (heuristic(start, goal), 0, start))
-    came_from = {start: None}
-    move_from_parent = {start: None}
-    gscore = {start: 0}
-
-    while open_set:
-        f, g, current = heapq.heappop(open_set)
-        if is_goal(current, goal):
-            # reconstruct path
-            path = []
-            moves = []
-            cur = current
-            while cur is not None:
-                path.append(cur)
-                moves.append(move_from_parent[cur])
-                cur = came_from[cur]
-            path.reverse(); moves.reverse()
-            return path, [m for m in moves[1:]]
-        for ns, mv in neighbors(current):
-            tentative_g = gscore[current] + 1
-            if ns not in gscore or tentative_g < gscore[ns]:
-                gscore[ns] = tentative_g
-                came_from[ns] = current
-                move_from_parent[ns] = mv
-                fscore = tentative_g + heuristic(ns, goal)
-                heapq.heappush(open_set, (fscore, tentative_g, ns))
-    return None
-
-def uniform_cost_search(start, goal):
-    open_set = []
-    heapq.heappush(open_set, (0, start))
-    came_from = {start: None}
-    move_from_parent = {start: None}
-    gscore = {start: 0}
-
-    while open_set:
-        cost, current = heapq.heappop(open_set)
-
-        if is_goal(current, goal):
-            path, moves = [], []
-            cur = current
-            while cur is not None:
-                path.append(cur)
-                moves.append(move_from_parent[cur])
-                cur = came_from[cur]
-            return path[::-1], [m for m in moves[::-1][1:]]
-        
-        for ns, mv in neighbors(current):
-            tentative_g = gscore[current] + 1
-            if ns not in gscore or tentative_g < gscore[ns]:
-                gscore[ns] = tentative_g
-                came_from[ns] = current
-                move_from_parent[ns] = mv
-                heapq.heappush(open_set, (tentative_g, ns))
-    return None
-
-def greedy_best_first_search(start, goal, heuristic):
-    open_set = []
-    heapq.heappush(open_set, (heuristic(start, goal), start))
-    came_from = {start: None}
-    move_from_parent = {start: None}
+    return _best_first(start, goal, heuristic, control=control, stats=stats)
+
+def hda_star(start, goal, heuristic, workers=None, control=None, stats=None):
+    # Hash-distributed A*: each worker process owns the states that hash to it,
+    # with its own open list and node records, and sends generated children to
+    # their owners in batches. A goal popped by its owner sets the incumbent
+    # cost, which is broadcast so every worker prunes f >= incumbent. The run
+    # ends when two consecutive probe waves find every worker idle and the same
+    # equal totals of batches sent and received (nothing left in flight); the
+    # incumbent is then optimal, and the path is traced back through owners.
+    if stats is not None:
+        stats.phase('setup')
+    s, goal_code = pack(start), pack(goal)
+    bd = board_of(start)
+    if not is_solvable(start, goal):
+        if stats is not None:
+            stats.done()
+        return None
+    workers = workers or os.cpu_count() or 1
+    # heuristics_map entries are looked up by name in the workers rather than pickled
+    hname = name_of(heuristic)
+    import multiprocessing as mp  # deferred: it is most of this module's import time
+    ctx = mp.get_context('spawn')
+    inboxes = [ctx.Queue() for _ in range(workers)]
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_hda_worker, daemon=True,
+                         args=(i, inboxes, results, start, goal, hname, None if hname else heuristic))
+             for i in range(workers)]
+    best = INF
+    expanded = frontier = 0
+    try:
+        for p in procs:
+            p.start()
+        if stats is not None:
+            stats.phase('search')
+        wave, replies, last = 1, {}, None
+        for inbox in inboxes:
+            inbox.put(('probe', wave))
+        while True:
+            msg = _hda_receive(results, procs)
+            if control is not None and control.cancelled:
+                raise Cancelled()
+            if msg[0] == 'found' and msg[1] < best:
+                best = msg[1]
+                for inbox in inboxes:
+                    inbox.put(('bound', best))
+            elif msg[0] == 'status' and msg[2] == wave:
+                replies[msg[1]] = msg[3:]
+                if len(replies) == workers:
+                    sent = sum(r[0] for r in replies.values())
+                    received = sum(r[1] for r in replies.values())
+                    quiet = (sent, received) if sent == received and all(r[2] for r in replies.values()) else None
+                    if quiet is not None and quiet == last:
+                        break
+                    last = quiet
+                    expanded = sum(r[3] for r in replies.values())
+                    frontier = sum(r[4] for r in replies.values())
+                    if control is not None:
+                        control.report(expanded, frontier)
+                    wave, replies = wave + 1, {}
+                    for inbox in inboxes:
+                        inbox.put(('probe', wave))
+            elif msg[0] == 'error':
+                raise RuntimeError(msg[1])
+
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        totals = [0] * 5
+        done = 0
+        while done < workers:
+            msg = _hda_receive(results, procs)
+            if msg[0] == 'stats':
+                done += 1
+                for i, v in enumerate(msg[1:]):
+                    totals[i] = max(totals[i], v) if i == 3 else totals[i] + v
+        if stats is not None:
+            expanded, generated, stale, max_open, closed = totals
+            stats.add(expanded, generated, generated - closed + 1, stale, max_open, closed)
+            stats.phase('reconstruct')
+
+        result = None
+        if best < INF:
+            codes, dirs = [goal_code], []
+            code = goal_code
+            while code != s:
+                inboxes[_owner(code, workers)].put(('trace', code))
+                msg = _hda_receive(results, procs)
+                while msg[0] != 'record':
+                    msg = _hda_receive(results, procs)
+                d = msg[1] & 3
+                code = apply_move(code, d ^ 1, bd)
+                codes.append(code)
+                dirs.append(d)
+            codes.reverse(); dirs.reverse()
+            result = to_result(codes, dirs, bd)
+    finally:
+        for inbox in inboxes:
+            inbox.put(('exit',))
+        for p in procs:
+            p.join(timeout=1)
+            if p.is_alive():
+                p.terminate()
+                p.join()
+        # nobody reads the inboxes any more: don't wait at exit to flush
+        # messages for a worker that died
+        for inbox in inboxes:
+            inbox.cancel_join_thread()
+    if stats is not None:
+        stats.done()
+    return result
+
+def _hda_receive(results, procs):
+    # next message for the coordinator, or ('idle',) after a quiet poll. Workers
+    # only exit when told to, so one that is gone without a message (killed,
+    # out of memory, failed to start under spawn) fails the search
+    try:
+        return results.get(timeout=0.1)
+    except queue.Empty:
+        pass
+    for i, p in enumerate(procs):
+        if not p.is_alive() and results.empty():
+            raise RuntimeError(f'worker {i} exited with code {p.exitcode}')
+    return ('idle',)
+
+def _owner(code, workers):
+    # multiplicative hash so neighbouring codes spread over the workers
+    return (code * 0x9E3779B97F4A7C15 >> 32) % workers
+
+def _hda_worker(wid, inboxes, results, start, goal, hname, heuristic):
+    try:
+        _hda_search(wid, inboxes, results, start, goal, heuristics_map[hname] if hname else heuristic)
+    except Exception as e:
+        results.put(('error', f'worker {wid}: {type(e).__name__}: {e}'))
+
+def _hda_search(wid, inboxes, results, start, goal, heuristic):
+    workers = len(inboxes)
+    inbox = inboxes[wid]
+    s, goal_code = pack(start), pack(goal)
+    bd = board_of(start)
+    moves, bs, mask = bd.moves, bd.blank_shift, bd.mask
+    deltas, evaluate = prepare(heuristic, goal)
+    h0 = heuristic(start, goal)
+    open_set = open_list(1, h0)
+    push, pop = open_set.push, open_set.pop
+    nodes = {}
+    if _owner(s, workers) == wid:
+        nodes[s] = 0
+        push(h0, 0, s, h0)
+    out = [[] for _ in range(workers)]
+    best = INF
+    sent = received = expanded = generated = stale = max_open = 0
+    idle = False
+
+    while True:
+        # expand a chunk of nodes that can still beat the incumbent
+        n = 0
+        while open_set and n < HDA_CHUNK:
+            f, g, code, h = pop()
+            if g > nodes[code] >> 2:
+                stale += 1
+                continue
+            if f >= best:
+                push(f, g, code, h)
+                break
+            n += 1
+            if code == goal_code:
+                best = g
+                results.put(('found', g))
+                for o, other in enumerate(inboxes):
+                    if o != wid:
+                        other.put(('bound', g))
+                continue
+            tentative_g = g + 1
+            b = code >> bs
+            children = moves[b]
+            generated += len(children)
+            for d, shift, mul, bx in children:
+                t = (code >> shift) & mask
+                child = code ^ t * mul ^ bx
+                ch = h + deltas[b][d][t] if deltas is not None else evaluate(child)
+                if tentative_g + ch >= best:
+                    continue
+                o = _owner(child, workers)
+                if o == wid:
+                    rec = nodes.get(child)
+                    if rec is None or tentative_g < rec >> 2:
+                        nodes[child] = tentative_g << 2 | d
+                        push(tentative_g + ch, tentative_g, child, ch)
+                else:
+                    buf = out[o]
+                    buf.append((child, tentative_g, d, ch))
+                    if len(buf) >= HDA_BATCH:
+                        inboxes[o].put(('nodes', buf))
+                        out[o] = []
+                        sent += 1
+        expanded += n
+        if len(open_set) > max_open:
+            max_open = len(open_set)
+        for o, buf in enumerate(out):
+            if buf:
+                inboxes[o].put(('nodes', buf))
+                out[o] = []
+                sent += 1
+        idle = n == 0
+
+        # handle messages; block only when there is nothing to expand
+        block = idle
+        while True:
+            try:
+                msg = inbox.get(timeout=0.05) if block else inbox.get_nowait()
+            except queue.Empty:
+                break
+            block = False
+            kind = msg[0]
+            if kind == 'nodes':
+                received += 1
+                for child, g, d, h in msg[1]:
+                    rec = nodes.get(child)
+                    if rec is None or g < rec >> 2:
+                        nodes[child] = g << 2 | d
+                        push(g + h, g, child, h)
+                        idle = False
+            elif kind == 'bound':
+                best = min(best, msg[1])
+            elif kind == 'probe':
+                results.put(('status', wid, msg[1], sent, received, idle, expanded, len(open_set)))
+            elif kind == 'stop':
+                results.put(('stats', expanded, generated, stale, max_open, len(nodes)))
+                # serve path lookups until the coordinator is done
+                while True:
+                    msg = inbox.get()
+                    if msg[0] == 'trace':
+                        results.put(('record', nodes[msg[1]]))
+                    elif msg[0] == 'exit':
+                        return
+            elif kind == 'exit':
+                return
+
+def memory_bounded_a_star(start, goal, heuristic, max_stored=1000000, control=None, stats=None):
+    # A*+IDA*: plain A* until `max_stored` states are recorded, then a bounded
+    # depth-first pass (contour) below each frontier node. A global threshold
+    # starts at the smallest frontier f; every frontier node with f <= threshold
+    # is searched to that threshold, which then rises to the smallest f cut
+    # off. Memory stays at max_stored records plus O(depth); the cost of the
+    # cap is the subtrees regenerated on each threshold, counted in
+    # stats.reexpanded.
+    if stats is not None:
+        stats.phase('setup')
+    s, goal_code = pack(start), pack(goal)
+    bd = board_of(start)
+    deltas, evaluate = prepare(heuristic, goal)
+    h0 = heuristic(start, goal) if heuristic is not None else 0
+    open_set = open_list(1, h0)
+    if is_solvable(start, goal):
+        open_set.push(h0, 0, s, h0)
+    nodes = {s: 0}
+    counts = [0] * 4
+    found, dirs, tail = False, None, None
+    sub = SearchStats()   # counters from the depth-first passes
+    reexpanded = 0
+    track = stats is not None
+
+    if track:
+        stats.phase('search')
+    try:
+        if _expand(open_set, nodes, goal_code, bd, deltas, evaluate, 1, control, counts, max_stored):
+            found, tail = True, goal_code
+        if not found and open_set:
+            # node cap reached: regenerate below the live frontier instead
+            frontier = []
+            while open_set:
+                f, g, code, h = open_set.pop()
+                if g == nodes[code] >> 2:
+                    frontier.append((f, -g, code, h))
+            frontier.sort()
+            threshold = frontier[0][0]
+            while not found and threshold < INF:
+                before = sub.expanded
+                next_threshold = INF
+                for f, ng, code, h in frontier:
+                    if f > threshold:
+                        next_threshold = min(next_threshold, f)
+                        break
+                    dirs, cut = contour(code, goal_code, threshold + ng, h, deltas, evaluate, bd, control, sub)
+                    if dirs is not None:
+                        found, tail = True, code
+                        break
+                    next_threshold = min(next_threshold, cut - ng)
+                if not found:
+                    # every node expanded this round is expanded again in the next
+                    reexpanded += sub.expanded - before
+                threshold = next_threshold
+    finally:
+        if track:
+            pops, stale, generated, max_frontier = counts
+            pushed = pops + len(open_set) - 1
+            stats.add(pops - stale - (found and dirs is None), generated, generated - pushed, stale,
+                      max_frontier, len(nodes), reexpanded)
+            stats.add(sub.expanded, sub.generated, 0, 0, sub.max_frontier)
+            stats.phase('reconstruct')
+    result = None
+    if found:
+        codes, path_dirs = trace(nodes, s, tail, bd)
+        for d in dirs or ():
+            codes.append(apply_move(codes[-1], d, bd))
+            path_dirs.append(d)
+        result = to_result(codes, path_dirs, bd)
+    if track:
+        stats.done()
+    return result
+
+def ida_star(start, goal, heuristic, max_bound=None, control=None, stats=None):
+    # memory O(depth): iterative DFS with undo moves, thresholds raised to the
+    # smallest f that exceeded the previous one
+    return iterative_deepening(start, goal, heuristic, max_bound, control, stats)
+
+def perfect_db_search(start, goal, control=None, stats=None):
+    # O(path length) lookup in the mmapped distance database; no search at all
+    if stats is not None:
+        stats.phase('search')
+    result = get_db().solve(start, goal)
+    if stats is not None:
+        stats.done()
+    return result
+
+def uniform_cost_search(start, goal, control=None, stats=None):
+    return _best_first(start, goal, control=control, stats=stats)
+
+def greedy_best_first_search(start, goal, heuristic, control=None, stats=None):
+    if stats is not None:
+        stats.phase('setup')
+    if not is_solvable(start, goal):
+        if stats is not None:
+            stats.done()
+        return None
+    s, goal_code = pack(start), pack(goal)
+    bd = board_of(start)
+    moves, bs, mask = bd.moves, bd.blank_shift, bd.mask
+    deltas, evaluate = prepare(heuristic, goal)
+    h0 = heuristic(start, goal)
+    open_set = [(h0, s)]
+    nodes = {s: 0}
     visited = set()
+    pops = stale = generated = max_frontier = 0
+    found = False
+    track = stats is not None
+
+    if track:
+        stats.phase('search')
+    try:
+        while open_set:
+            h, current = heapq.heappop(open_set)
+            pops += 1
+            if control is not None and not pops & CHECK_MASK:
+                control.tick(len(open_set))
+
+            if current in visited:
+                stale += 1
+                continue
+            visited.add(current)
+
+            if current == goal_code:
+                found = True
+                break
+
+            b = current >> bs
+            children = moves[b]
+            generated += len(children)
+            for d, shift, mul, bx in children:
+                t = (current >> shift) & mask
+                child = current ^ t * mul ^ bx
+                if child not in visited:
+                    nodes[child] = d
+                    ch = h + deltas[b][d][t] if deltas is not None else evaluate(child)
+                    heapq.heappush(open_set, (ch, child))
+            if track and len(open_set) > max_frontier:
+                max_frontier = len(open_set)
+    finally:
+        if track:
+            pushed = pops + len(open_set) - 1
+            stats.add(pops - stale - found, generated, generated - pushed, stale, max_frontier, len(visited))
+            stats.phase('reconstruct')
+    result = to_result(*trace(nodes, s, goal_code, bd), bd) if found else None
+    if track:
+        stats.done()
+    return result
+
+def weighted_a_star(start, goal, heuristic, weight=1.5, control=None, stats=None):
+    return _best_first(start, goal, heuristic, weight, control, stats)
+
+def ara_star(start, goal, heuristic, weight=3.0, step=0.5, control=None, stats=None, on_solution=None):
+    # Anytime Repairing A*: weighted A* from `weight`, lowered by `step` down
+    # to 1 after each solution. Later passes keep every g value: nodes
+    # improved after being closed wait in an INCONS set and are re-queued with
+    # the open nodes under the new weight, instead of starting over. Each
+    # improved solution (or tighter bound) is passed to on_solution(result,
+    # bound), where bound is a proven limit on cost / optimal cost. When a budget in `control`
+    # runs out the best solution so far is returned.
+    if not 1 <= weight < INF:
+        raise ValueError('ARA* needs a finite weight of at least 1')
+    if stats is not None:
+        stats.phase('setup')
+    s, goal_code = pack(start), pack(goal)
+    bd = board_of(start)
+    moves, bs, mask = bd.moves, bd.blank_shift, bd.mask
+    deltas, evaluate = prepare(heuristic, goal)
+    h0 = heuristic(start, goal)
+    nodes = {s: 0}
+    hs = {s: h0}
+    open_nodes, incons, closed = {s}, set(), set()
+    heap = []
+    best = None   # (cost, (codes, dirs), bound) of the best solution so far
+    pops = stale = generated = max_frontier = 0
+    track = stats is not None
+    if not is_solvable(start, goal):
+        open_nodes = set()
+
+    if track:
+        stats.phase('search')
+    try:
+        while True:
+            # (re)key OPEN under the current weight
+            heap = [(((nodes[c] >> 2) + weight * hs[c]), -(nodes[c] >> 2), c) for c in open_nodes]
+            heapq.heapify(heap)
+            while heap:
+                key, ng, current = heap[0]
+                g = -ng
+                if current not in open_nodes or g != nodes[current] >> 2:
+                    heapq.heappop(heap)
+                    pops += 1; stale += 1
+                    continue
+                if goal_code in nodes and nodes[goal_code] >> 2 <= key:
+                    break
+                heapq.heappop(heap)
+                pops += 1
+                if control is not None and not pops & CHECK_MASK:
+                    control.tick(len(heap))
+                open_nodes.discard(current)
+                closed.add(current)
+                h = hs[current]
+                tentative_g = g + 1
+                b = current >> bs
+                children = moves[b]
+                generated += len(children)
+                for d, shift, mul, bx in children:
+                    t = (current >> shift) & mask
+                    child = current ^ t * mul ^ bx
+                    rec = nodes.get(child)
+                    if rec is None or tentative_g < rec >> 2:
+                        nodes[child] = tentative_g << 2 | d
+                        if rec is None:
+                            hs[child] = h + deltas[b][d][t] if deltas is not None else evaluate(child)
+                        if child in closed:
+                            incons.add(child)
+                        else:
+                            open_nodes.add(child)
+                            heapq.heappush(heap, (tentative_g + weight * hs[child], -tentative_g, child))
+                if track and len(heap) > max_frontier:
+                    max_frontier = len(heap)
+
+            if goal_code not in nodes:
+                break   # no solution at all
+            cost = nodes[goal_code] >> 2
+            waiting = open_nodes | incons
+            lower = min(((nodes[c] >> 2) + hs[c] for c in waiting), default=cost)
+            bound = min(weight, cost / lower) if lower else 1.0
+            if best is None or cost < best[0] or bound < best[2]:
+                best = (cost, trace(nodes, s, goal_code, bd), bound)
+                if on_solution is not None:
+                    on_solution(to_result(*best[1], bd), bound)
+            if weight <= 1 or bound <= 1:
+                break
+            weight = max(1.0, weight - step)
+            open_nodes |= incons
+            incons, closed = set(), set()
+    except BudgetExceeded:
+        if best is None:
+            raise
+    finally:
+        if track:
+            stats.add(pops - stale, generated, generated - len(nodes) + 1, stale, max_frontier, len(nodes))
+            stats.phase('reconstruct')
+    result = to_result(*best[1], bd) if best is not None else None
+    if track:
+        stats.done()
+    return result
+
+def bidirectional_mm(start, goal, heuristic, control=None, stats=None):
+    # Front-to-end bidirectional A* (MM). Each side orders its open list by
+    # max(g + h, 2g), with h measured toward the opposite end, and the side
+    # with the smaller minimum priority is expanded. A child known to both
+    # sides gives a path of cost g + g_other; the best one is optimal once it
+    # is no more than the smaller minimum priority.
+    if stats is not None:
+        stats.phase('setup')
+    s, goal_code = pack(start), pack(goal)
+    bd = board_of(start)
+    moves, bs, mask = bd.moves, bd.blank_shift, bd.mask
+    deltas_f, evaluate_f = prepare(heuristic, goal)
+    deltas_b, evaluate_b = prepare(heuristic, start)
+    hf, hb = heuristic(start, goal), heuristic(goal, start)
+    solvable = is_solvable(start, goal)
+    open_f = [(hf, 0, s, hf)] if solvable else []
+    open_b = [(hb, 0, goal_code, hb)] if solvable else []
+    nodes_f = {s: 0}
+    nodes_b = {goal_code: 0}
+    meeting, best = (s, 0) if s == goal_code else (None, INF)
+    pops = stale = generated = max_frontier = 0
+    track = stats is not None
 
-    while open_set:
-        h, current = heapq.heappop(open_set)
-
-        if current in visited:
-            continue
-        visited.add(current)
-
-        if is_goal(current, goal):
-            path, moves = [], []
-            cur = current
-            while cur is not None:
-                path.append(cur)
-                moves.append(move_from_parent[cur])
-                cur = came_from[cur]
-            return path[::-1], [m for m in moves[::-1][1:]]
-        
-        for ns, mv in neighbors(current):
-            if ns not in visited:
-                came_from[ns] = current
-                move_from_parent[ns] = mv
-                heapq.heappush(open_set, (heuristic(ns, goal), ns))
-
-    return None
-
-def weighted_a_star(start, goal, heuristic, weight=1.5):
-    open_set = []
-    heapq.heappush(open_set, (weight * heuristic(start, goal), 0, start))
-    came_from = {start: None}
-    move_from_parent = {start: None}
-    gscore = {start: 0}
-
-    while open_set:
-        f, g, current = heapq.heappop(open_set)
-
-        if is_goal(current, goal):
-            path, moves = [], []
-            cur = current
-            while cur is not None:
-                path.append(cur)
-                moves.append(move_from_parent[cur])
-                cur = came_from[cur]
-            return path[::-1], [m for m in moves[::-1][1:]]
-
-        for ns, mv in neighbors(current):
-            tentative_g = gscore[current] + 1
-            if ns not in gscore or tentative_g < gscore[ns]:
-                gscore[ns] = tentative_g
-                came_from[ns] = current
-                move_from_parent[ns] = mv
-                fscore = tentative_g + weight * heuristic(ns, goal)
-                heapq.heappush(open_set, (fscore, tentative_g, ns))
-
-    return None
+    if track:
+        stats.phase('search')
+    try:
+        while True:
+            # drop superseded entries so both tops are live
+            while open_f and open_f[0][1] > nodes_f[open_f[0][2]] >> 2:
+                heapq.heappop(open_f); pops += 1; stale += 1
+            while open_b and open_b[0][1] > nodes_b[open_b[0][2]] >> 2:
+                heapq.heappop(open_b); pops += 1; stale += 1
+            if not open_f or not open_b or best <= min(open_f[0][0], open_b[0][0]):
+                break
+            if (open_f[0][0], len(open_f)) <= (open_b[0][0], len(open_b)):
+                open_set, nodes, other, deltas, evaluate = open_f, nodes_f, nodes_b, deltas_f, evaluate_f
+            else:
+                open_set, nodes, other, deltas, evaluate = open_b, nodes_b, nodes_f, deltas_b, evaluate_b
+            _, g, current, h = heapq.heappop(open_set)
+            pops += 1
+            if control is not None and not pops & CHECK_MASK:
+                control.tick(len(open_f) + len(open_b))
+            tentative_g = g + 1
+            b = current >> bs
+            children = moves[b]
+            generated += len(children)
+            for d, shift, mul, bx in children:
+                t = (current >> shift) & mask
+                child = current ^ t * mul ^ bx
+                rec = nodes.get(child)
+                if rec is None or tentative_g < rec >> 2:
+                    nodes[child] = tentative_g << 2 | d
+                    ch = h + deltas[b][d][t] if deltas is not None else evaluate(child)
+                    heapq.heappush(open_set, (max(tentative_g + ch, 2 * tentative_g), tentative_g, child, ch))
+                    seen = other.get(child)
+                    if seen is not None and tentative_g + (seen >> 2) < best:
+                        best, meeting = tentative_g + (seen >> 2), child
+            if track and len(open_f) + len(open_b) > max_frontier:
+                max_frontier = len(open_f) + len(open_b)
+    finally:
+        if track:
+            closed = len(nodes_f) + len(nodes_b)
+            pushed = pops + len(open_f) + len(open_b) - 2
+            stats.add(pops - stale, generated, generated - pushed, stale, max_frontier, closed)
+            stats.phase('reconstruct')
+    result = reconstruct_bidirectional_path(meeting, s, goal_code, nodes_f, nodes_b, bd) if meeting is not None else None
+    if track:
+        stats.done()
+    return result
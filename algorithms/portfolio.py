@@ -0,0 +1,266 @@
+# Portfolio racing: several searches run on the same instance, each in its own
+# process, and the first answer that meets the requested guarantee wins; the
+# others are cancelled at once. A guarantee is a suboptimality bound: 1 for an
+# optimal path, w > 1 for one at most w times optimal, inf for any solution.
+# Searches that cannot meet the bound are not started. Each win is recorded
+# in data/portfolio.json under a coarse instance class (board size, bound,
+# Manhattan distance), and WinnerStats.rank() orders the candidates by those
+# wins, so when there are fewer worker slots than candidates the likeliest
+# winners start first and the rest wait for a slot.
+#
+# Budgets in the parent's control are passed down: each racer gets the time
+# left when it starts, and an equal share of the node budget left, split over
+# the worker slots, so the racers running at once stay within it together. A
+# racer that runs out stops itself; when every racer has, race() raises
+# BudgetExceeded.
+import json
+import os
+import queue
+import time
+from algorithms import registry
+from utils import DATA_DIR
+from utils.heuristics import manhattan, name_of
+from utils.puzzle_utils import board_of, is_solvable
+from utils.search_control import SearchControl, Cancelled, BudgetExceeded
+from utils.search_stats import SearchStats
+
+DEFAULT_PATH = os.path.join(DATA_DIR, 'portfolio.json')
+# default racers, cheapest answers first: the order used until winners are recorded
+CANDIDATES = ('greedy_best_first_search', 'weighted_a_star', 'ara_star', 'bidirectional_search', 'a_star',
+              'bidirectional_mm', 'ida_star', 'bfs')
+ANY_WEIGHT = 2.0       # weighted_a_star's weight when any solution will do
+POLL = 0.05            # seconds between checks of the parent's control
+PROGRESS_INTERVAL = 0.2
+GRACE = 0.1            # seconds a cancelled racer gets to exit before it is terminated
+
+class WinnerStats:
+    # {instance class: {algorithm: [wins, total seconds]}}, saved as JSON.
+    # Concurrent writers (e.g. batch workers) do not merge: the last save wins.
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.classes = None
+
+    def load(self):
+        if self.classes is None:
+            try:
+                with open(self.path) as f:
+                    self.classes = json.load(f)
+            except (OSError, ValueError):
+                self.classes = {}
+        return self.classes
+
+    def record(self, key, name, elapsed):
+        entry = self.load().setdefault(key, {}).setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] = round(entry[1] + elapsed, 6)
+
+    def rank(self, key, names):
+        # most wins first, then the lower mean time; unseen names keep their order
+        seen = self.load().get(key, {})
+        def order(item):
+            i, name = item
+            wins, total = seen.get(name, (0, 0.0))
+            return (-wins, total / wins if wins else 0.0, i)
+        return [name for i, name in sorted(enumerate(names), key=order)]
+
+    def save(self):
+        if self.classes is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.classes, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+def instance_class(start, goal, bound):
+    # coarse key for winner statistics: '3x3 optimal h16-19'
+    n = board_of(start).n
+    h = manhattan(start, goal) // 4 * 4
+    kind = 'optimal' if bound == 1 else 'any' if bound == float('inf') else f'w{bound:g}'
+    return f'{n}x{n} {kind} h{h}-{h + 3}'
+
+def plan(names, bound):
+    # {name: options} for the candidates that can meet `bound`
+    out = {}
+    for name in names:
+        entry = registry.get(name)
+        if entry.processes:
+            raise ValueError(f'{name} starts its own processes and cannot race in a portfolio')
+        if entry.optimal:
+            out[name] = {}
+        elif name == 'weighted_a_star' and bound > 1:
+            out[name] = {'weight': min(bound, ANY_WEIGHT)}
+        elif name == 'ara_star' and bound > 1:
+            out[name] = {'weight': max(bound if bound != float('inf') else ANY_WEIGHT, 3.0)}
+        elif bound == float('inf'):
+            out[name] = {}
+    return out
+
+def proven_bound(name, options):
+    # suboptimality bound of a search that ran to completion
+    entry = registry.get(name)
+    if entry.optimal or name == 'ara_star':  # ARA* only returns once its bound reaches 1
+        return 1.0
+    if name == 'weighted_a_star':
+        return options['weight']
+    return float('inf')
+
+def _racer(results, cancel_event, name, start, goal, hname, options, budget):
+    # runs in a spawned process; every message starts with the racer's name.
+    # `budget` holds SearchControl's max_nodes / max_time for this racer.
+    last = [0.0]
+
+    def on_progress(expanded, frontier, elapsed):
+        if elapsed - last[0] >= PROGRESS_INTERVAL:
+            last[0] = elapsed
+            results.put(('progress', name, expanded))
+
+    def on_solution(result, bound):
+        results.put(('solution', name, result, bound, control.elapsed()))
+
+    control = SearchControl(cancel_event, on_progress, **budget)
+    stats = SearchStats()
+    try:
+        result = registry.get(name).run(start, goal, hname, control, stats, on_solution=on_solution, **options)
+    except BudgetExceeded as e:
+        results.put(('budget', name, str(e)))
+    except Cancelled:
+        return
+    except Exception as e:
+        results.put(('error', name, f'{type(e).__name__}: {e}'))
+    else:
+        # anytime searches return their best so far when a budget runs out;
+        # that is not a completed run, and its bound went out with on_solution
+        if control.max_nodes is not None and control.expanded >= control.max_nodes:
+            results.put(('budget', name, 'nodes'))
+        elif control.max_time is not None and control.elapsed() >= control.max_time:
+            results.put(('budget', name, 'time'))
+        else:
+            results.put(('done', name, result, control.elapsed(), stats.as_dict()))
+
+def race(start, goal, hname='manhattan', bound=1.0, names=None, workers=None, control=None, stats=None,
+         winners=None):
+    # (result, winner, bound) of the first answer within `bound`, or
+    # (None, None, None) when no racer finds one. `winners` is a WinnerStats
+    # (None: the default file, False: do not record or rank).
+    if stats is not None:
+        stats.phase('setup')
+    if bound < 1:
+        raise ValueError('bound must be at least 1')
+    if not is_solvable(start, goal):
+        if stats is not None:
+            stats.done()
+        return None, None, None
+    if winners is None:
+        winners = WinnerStats()
+    options = plan(names or CANDIDATES, bound)
+    if not options:
+        raise ValueError(f'no candidate search can guarantee a bound of {bound:g}')
+    key = instance_class(start, goal, bound)
+    pending = winners.rank(key, list(options)) if winners else list(options)
+    workers = workers or min(len(pending), max(2, os.cpu_count() or 1))
+
+    import multiprocessing as mp
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    running = {}   # name -> (process, cancel event)
+    progress = {}  # name -> last reported expansions
+    winner = best = None
+    errors, exhausted = [], []
+    max_nodes = control.max_nodes if control is not None else None
+    max_time = control.max_time if control is not None else None
+    started = time.perf_counter()
+    if stats is not None:
+        stats.phase('search')
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                name = pending.pop(0)
+                event = ctx.Event()
+                budget = {}
+                if max_nodes is not None:
+                    budget['max_nodes'] = max(1, (max_nodes - sum(progress.values())) // workers)
+                if max_time is not None:
+                    budget['max_time'] = max(0.0, max_time - control.elapsed())
+                proc = ctx.Process(target=_racer, daemon=True,
+                                   args=(results, event, name, start, goal, hname, options[name], budget))
+                proc.start()
+                running[name] = (proc, event)
+            try:
+                msg = results.get(timeout=POLL)
+            except queue.Empty:
+                msg = None
+            if control is not None:
+                control.report(sum(progress.values()), len(running))
+            if msg is None:
+                for name, (proc, _) in list(running.items()):
+                    if not proc.is_alive() and results.empty():
+                        # died without a message (e.g. out of memory)
+                        del running[name]
+                        errors.append(f'{name}: exited with code {proc.exitcode}')
+                continue
+            kind, name = msg[0], msg[1]
+            if kind == 'progress':
+                progress[name] = msg[2]
+                continue
+            if kind == 'solution':
+                _, _, result, b, _ = msg
+                if b <= bound:
+                    winner, best = name, (result, b, None)
+                    break
+                continue
+            proc = running.pop(name, (None, None))[0]
+            if proc is not None:
+                proc.join()
+            if kind == 'error':
+                errors.append(f'{name}: {msg[2]}')
+            elif kind == 'budget':
+                exhausted.append(msg[2])
+            elif kind == 'done' and msg[2] is not None:
+                _, _, result, _, racer_stats = msg
+                b = proven_bound(name, options[name])
+                if b <= bound:
+                    winner, best = name, (result, b, racer_stats)
+                    break
+    finally:
+        for proc, event in running.values():
+            event.set()
+        for proc, event in running.values():
+            proc.join(GRACE)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+        if stats is not None:
+            stats.phase(None)
+    elapsed = time.perf_counter() - started
+    if winner is None:
+        if stats is not None:
+            stats.done()
+        if errors and len(errors) == len(options):
+            raise ValueError('every racer failed; ' + '; '.join(errors))
+        if exhausted:
+            raise BudgetExceeded(exhausted[-1])
+        return None, None, None
+    result, b, racer_stats = best
+    if winners:
+        winners.record(key, winner, elapsed)
+        winners.save()
+    if stats is not None:
+        if racer_stats is not None:
+            stats.add(racer_stats['expanded'], racer_stats['generated'], racer_stats['duplicates'],
+                      racer_stats['stale_pops'], racer_stats['max_frontier'], racer_stats['max_closed'],
+                      racer_stats['reexpanded'])
+        else:
+            stats.add(sum(progress.values()))
+        stats.done()
+    return result, winner, b
+
+def portfolio(start, goal, heuristic, bound=1.0, control=None, stats=None, on_solution=None):
+    # registry entry: race the default candidates; on_solution(result, bound, winner)
+    hname = name_of(heuristic)
+    if hname is None:
+        raise ValueError('portfolio racers need a heuristics_map heuristic')
+    result, winner, b = race(start, goal, hname, bound, control=control, stats=stats)
+    if result is not None and on_solution is not None:
+        on_solution(result, b, winner)
+    return result
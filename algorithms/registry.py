@@ -0,0 +1,90 @@
+# Lazy registry of the searches and heuristics. Entries name their module as
+# a string, so listing algorithms (UI dropdowns, CLI argument checks) imports
+# no search code; a module is imported the first time one of its searches runs.
+import importlib
+
+class Algorithm:
+    def __init__(self, name, label, module, optimal=False, heuristic=False, options=None, processes=False):
+        self.name = name            # function name, used by the CLIs and the daemon
+        self.label = label          # UI dropdown label; None keeps it out of the UI
+        self.module = module
+        self.optimal = optimal      # always returns an optimal path
+        self.heuristic = heuristic  # takes a heuristics_map entry
+        self.processes = processes  # starts processes of its own (so not from a daemon process)
+        # UI option -> (keyword argument, default used when the option is None)
+        self.options = options or {}
+        self._fn = None
+
+    def load(self):
+        if self._fn is None:
+            self._fn = getattr(importlib.import_module(self.module), self.name)
+        return self._fn
+
+    def required(self):
+        # options with no default, which the caller has to supply
+        return [key for key, (param, default) in self.options.items() if default is None and key != 'on_solution']
+
+    def run(self, start, goal, hname=None, control=None, stats=None, **options):
+        kwargs = {'control': control, 'stats': stats}
+        if self.heuristic:
+            kwargs['heuristic'] = heuristic(hname)
+        for key, (param, default) in self.options.items():
+            value = options.get(key)
+            kwargs[param] = default if value is None else value
+        return self.load()(start, goal, **kwargs)
+
+UNINFORMED = 'algorithms.uninformed_searches'
+INFORMED = 'algorithms.informed_searches'
+
+# in UI dropdown order
+ALGORITHMS = [
+    Algorithm('bfs', 'BFS', UNINFORMED, optimal=True),
+    Algorithm('dfs', 'DFS', UNINFORMED),
+    Algorithm('dls', 'DLS', UNINFORMED, options={'limit': ('limit', None)}),
+    Algorithm('ids', 'IDS', UNINFORMED, optimal=True),
+    Algorithm('vector_bfs', None, UNINFORMED, optimal=True),
+    Algorithm('external_bfs', None, UNINFORMED, optimal=True),
+    Algorithm('bidirectional_search', 'Bidirectional', UNINFORMED, optimal=True),
+    Algorithm('bidirectional_mm', 'Bidirectional MM', INFORMED, optimal=True, heuristic=True),
+    Algorithm('a_star', 'A*', INFORMED, optimal=True, heuristic=True),
+    Algorithm('hda_star', None, INFORMED, optimal=True, heuristic=True, processes=True),
+    Algorithm('ida_star', 'IDA*', INFORMED, optimal=True, heuristic=True),
+    Algorithm('memory_bounded_a_star', 'Memory-bounded A*', INFORMED, optimal=True, heuristic=True,
+              options={'limit': ('max_stored', 1000000)}),
+    Algorithm('uniform_cost_search', 'UCS', INFORMED, optimal=True),
+    Algorithm('greedy_best_first_search', 'Greedy Best First Search', INFORMED, heuristic=True),
+    Algorithm('weighted_a_star', 'Weighted A*', INFORMED, heuristic=True, options={'weight': ('weight', 1.5)}),
+    Algorithm('ara_star', 'ARA*', INFORMED, heuristic=True,
+              options={'weight': ('weight', 3.0), 'on_solution': ('on_solution', None)}),
+    Algorithm('perfect_db_search', 'Perfect DB', INFORMED, optimal=True),
+    # races several of the above; optimal when bound is 1
+    Algorithm('portfolio', 'Portfolio', 'algorithms.portfolio', heuristic=True, processes=True,
+              options={'weight': ('bound', 1.0), 'on_solution': ('on_solution', None)}),
+]
+BY_NAME = {a.name: a for a in ALGORITHMS}
+BY_LABEL = {a.label: a for a in ALGORITHMS if a.label}
+
+# keys of utils.heuristics.heuristics_map, in UI dropdown order
+HEURISTICS = ('misplaced', 'manhattan', 'linear_conflict', 'walking_distance', 'max_lc_wd', 'pdb', 'pdb663', 'exact')
+
+def get(name):
+    # entry by function name or UI label
+    entry = BY_NAME.get(name) or BY_LABEL.get(name)
+    if entry is None:
+        raise ValueError(f'unknown algorithm: {name}')
+    return entry
+
+def valid_weight(name, weight):
+    # the Weight option is a heuristic weight, finite and at least 1, except
+    # for the portfolio, where it is a suboptimality bound and inf means any
+    if name in ('portfolio', 'Portfolio') and weight == float('inf'):
+        return True
+    return 1 <= weight < float('inf')
+
+def labels():
+    return list(BY_LABEL)
+
+def heuristic(name):
+    if name not in HEURISTICS:
+        raise ValueError(f'unknown heuristic: {name}')
+    return importlib.import_module('utils.heuristics').heuristics_map[name]
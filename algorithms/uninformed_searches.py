@@ -1,161 +1,217 @@
 from collections import deque
-from utils.puzzle_utils import neighbors, is_goal
-
-def bfs(start, goal):
-    # start, goal: tuples of length 9
-    if start == goal:
-        return [start], []
-
-    frontier = deque([start])
-    parent = {start: None}
-    move_from_parent = {start: None}
-
-    while frontier:
-        state = frontier.popleft()
-        if is_goal(state, goal):
-            # reconstruct path
-            path = []
-            moves = []
-            cur = state
-            while cur is not None:
-                path.append(cur)
-                moves.append(move_from_parent[cur])
-                cur = parent[cur]
-            path.reverse()
-            moves.reverse()
-            # first move is None (start) - chop it for moves list
-            return path, [m for m in moves[1:]]
-        for ns, mv in neighbors(state):
-            if ns not in parent:
-                parent[ns] = state
-                move_from_parent[ns] = mv
-                frontier.append(ns)
-    return None
-
-def dfs(start, goal, max_depth=1000):
-    stack = [(start, 0)]
-    parent = {start : None}
-    move_from_parent = {start : None}
-
-    while stack:
-        state, depth = stack.pop()
-        if is_goal(state, goal):
-            path, moves = [], []
-            cur = state
-
-            while cur is not None:
-                path.append(cur)
-                moves.append(move_from_parent[cur])
-                cur = parent[cur]
-            return path[::-1], [m for m in moves[::-1][1:]]
-        
-        if depth < max_depth:
-            for ns, mv in neighbors(state):
-                if ns not in parent:
-                    parent[ns] = state
-                    move_from_parent[ns] = mv
-                    stack.append((ns, depth + 1))
-    return None
-
-
-def dls(start, goal, limit):
-    def recursive_dls(state, goal, limit, parent, move_from_parent):
-        if is_goal(state, goal):
-            return [state], [move_from_parent[state]]
-        elif limit == 0:
-            return "cutoff"
-        else:
-            cutoff_occured = False
-            for ns, mv in neighbors(state):
-                if ns not in parent:
-                    parent[ns] = state
-                    move_from_parent[ns] = mv
-                    result = recursive_dls(ns, goal, limit - 1, parent, move_from_parent)
-                    if result == "cutoff":
-                        cutoff_occured = True
-                    elif result is not None:
-                        path, moves = result
-                        path.insert(0, state)
-                        moves.insert(0, mv)
-                        return path, moves
-            return "cutoff" if cutoff_occured else None
-        
-    parent = {start : None}
-    move_from_parent = {start : None}
-    result = recursive_dls(start, goal, limit, parent, move_from_parent)
-
-    if isinstance(result, tuple):
-        path, moves = result
-        return path, [m for m in moves[1:]] if len(moves) > 1 else []
-    
-    return None
-
-def ids(start, goal, max_depth=50):
-    for depth in range(max_depth):
-        result = dls(start, goal, depth)
-        if result is not None:
-            return result
-    return None
-
-def bidirectional_search(start, goal):
-    if start == goal:
-        return [start], []
-
-    frontier_start = deque([start])
-    frontier_goal = deque([goal])
-
-    parent_start = {start: None}
-    parent_goal = {goal: None}
-    
-    move_from_start = {start: None}
-    move_from_goal = {goal: None}
-
-    while frontier_start and frontier_goal:
-        # Expand forward frontier
-        state_fwd = frontier_start.popleft()
-        for ns, mv in neighbors(state_fwd):
-            if ns not in parent_start:
-                parent_start[ns] = state_fwd
-                move_from_start[ns] = mv
-                frontier_start.append(ns)
-                if ns in parent_goal:
-                    # Meeting point found
-                    return reconstruct_bidirectional_path(ns, parent_start, parent_goal, move_from_start, move_from_goal)
-
-        # Expand backward frontier
-        state_bwd = frontier_goal.popleft()
-        for ns, mv in neighbors(state_bwd):
-            if ns not in parent_goal:
-                parent_goal[ns] = state_bwd
-                move_from_goal[ns] = mv
-                frontier_goal.append(ns)
-                if ns in parent_start:
-                    return reconstruct_bidirectional_path(ns, parent_start, parent_goal, move_from_start, move_from_goal)
-
-    return None
-
-
-def reconstruct_bidirectional_path(meeting_state, parent_start, parent_goal, move_from_start, move_from_goal):
-    # Reconstruct forward path
-    path_start, moves_start = [], []
-    cur = meeting_state
-    while cur is not None:
-        path_start.append(cur)
-        moves_start.append(move_from_start[cur])
-        cur = parent_start[cur]
-    path_start.reverse()
-    moves_start.reverse()
-
-    # Reconstruct backward path
-    path_goal, moves_goal = [], []
-    cur = meeting_state
-    while cur is not None:
-        path_goal.append(cur)
-        moves_goal.append(move_from_goal[cur])
-        cur = parent_goal[cur]
-
-    # Combine both halves (excluding duplicate meeting point)
-    full_path = path_start + path_goal[1:]
-    full_moves = [m for m in moves_start[1:] + moves_goal[:-1] if m]
-
-    return full_path, full_moves
+from utils.puzzle_utils import pack, board_of, trace, to_result, is_solvable
+from algorithms.depth_first import INF, contour, moves_to_result, iterative_deepening
+from utils.search_control import CHECK_MASK
+
+# Every search keeps one record per visited packed state in `nodes`; the low
+# two bits are the blank move that reached it and the path is rebuilt by trace().
+# `stats` (a SearchStats) is filled from local counters when the loop exits.
+
+def bfs(start, goal, control=None, stats=None):
+    # start, goal: flat tuples of an n x n board
+    if stats is not None:
+        stats.phase('setup')
+    if not is_solvable(start, goal):
+        if stats is not None:
+            stats.done()
+        return None
+    s, g = pack(start), pack(goal)
+    bd = board_of(start)
+    moves, bs, mask = bd.moves, bd.blank_shift, bd.mask
+    frontier = deque([s])
+    nodes = {s: 0}
+    expanded = generated = max_frontier = 0
+    found = s == g
+    track = stats is not None
+
+    if track:
+        stats.phase('search')
+    try:
+        while frontier and not found:
+            code = frontier.popleft()
+            expanded += 1
+            if control is not None and not expanded & CHECK_MASK:
+                control.tick(len(frontier))
+            children = moves[code >> bs]
+            generated += len(children)
+            for d, shift, mul, bx in children:
+                child = code ^ ((code >> shift) & mask) * mul ^ bx
+                if child not in nodes:
+                    nodes[child] = d
+                    if child == g:
+                        found = True
+                        break
+                    frontier.append(child)
+            if track and len(frontier) > max_frontier:
+                max_frontier = len(frontier)
+    finally:
+        if track:
+            stats.add(expanded, generated, generated - len(nodes) + 1, 0, max_frontier, len(nodes))
+            stats.phase('reconstruct')
+    result = to_result(*trace(nodes, s, g, bd), bd) if found else None
+    if track:
+        stats.done()
+    return result
+
+def dfs(start, goal, max_depth=1000, control=None, stats=None):
+    if stats is not None:
+        stats.phase('setup')
+    if not is_solvable(start, goal):
+        if stats is not None:
+            stats.done()
+        return None
+    s, g = pack(start), pack(goal)
+    bd = board_of(start)
+    moves, bs, mask = bd.moves, bd.blank_shift, bd.mask
+    stack = [(s, 0)]
+    nodes = {s: 0}
+    expanded = generated = max_frontier = 0
+    found = False
+    track = stats is not None
+
+    if track:
+        stats.phase('search')
+    try:
+        while stack:
+            code, depth = stack.pop()
+            if code == g:
+                found = True
+                break
+            expanded += 1
+            if control is not None and not expanded & CHECK_MASK:
+                control.tick(len(stack))
+
+            if depth < max_depth:
+                children = moves[code >> bs]
+                generated += len(children)
+                for d, shift, mul, bx in children:
+                    child = code ^ ((code >> shift) & mask) * mul ^ bx
+                    if child not in nodes:
+                        nodes[child] = d
+                        stack.append((child, depth + 1))
+                if track and len(stack) > max_frontier:
+                    max_frontier = len(stack)
+    finally:
+        if track:
+            stats.add(expanded, generated, generated - len(nodes) + 1, 0, max_frontier, len(nodes))
+            stats.phase('reconstruct')
+    result = to_result(*trace(nodes, s, g, bd), bd) if found else None
+    if track:
+        stats.done()
+    return result
+
+
+def dls(start, goal, limit, control=None, stats=None):
+    # single depth-bounded pass with no visited set: contour() only skips the
+    # move that undoes the previous one, so a state can be reached again along
+    # longer cycles and by other branches, and is searched each time
+    if stats is not None:
+        stats.phase('setup')
+    if not is_solvable(start, goal):
+        # the tree below start holds no path; don't walk all of it
+        if stats is not None:
+            stats.done()
+        return None
+    s, g = pack(start), pack(goal)
+    bd = board_of(start)
+    if stats is not None:
+        stats.phase('search')
+    try:
+        dirs, _ = contour(s, g, limit, 0, bd=bd, control=control, stats=stats)
+    finally:
+        if stats is not None:
+            stats.phase('reconstruct')
+    result = moves_to_result(s, dirs, bd) if dirs is not None else None
+    if stats is not None:
+        stats.done()
+    return result
+
+def vector_bfs(start, goal, control=None, stats=None):
+    # whole-layer BFS over NumPy arrays (3x3 only; NumPy is optional)
+    try:
+        from algorithms.vector_bfs import layered_bfs
+    except ModuleNotFoundError as e:
+        if e.name != 'numpy':
+            raise
+        raise ValueError('vector_bfs needs NumPy') from None
+    return layered_bfs(start, goal, control, stats)
+
+def external_bfs(start, goal, control=None, stats=None):
+    # layer BFS with the layers on disk and RAM held to a fixed budget
+    from algorithms.external_bfs import external_bfs as search
+    return search(start, goal, control=control, stats=stats)
+
+def ids(start, goal, max_depth=50, control=None, stats=None):
+    return iterative_deepening(start, goal, max_bound=max_depth - 1, control=control, stats=stats)
+
+def bidirectional_search(start, goal, control=None, stats=None):
+    # Layer-synchronous bidirectional BFS. Each round expands one whole layer
+    # of whichever frontier is smaller; records are g << 2 | move. A new child
+    # already known to the other side closes a path of cost g + g_other, and
+    # the search stops once the best such cost is no more than
+    # depth_start + depth_goal + 1, the shortest any undiscovered path can be.
+    if stats is not None:
+        stats.phase('setup')
+    s, g = pack(start), pack(goal)
+    bd = board_of(start)
+    moves, bs, mask = bd.moves, bd.blank_shift, bd.mask
+    solvable = is_solvable(start, goal)
+    frontier_start = [s] if solvable else []
+    frontier_goal = [g] if solvable else []
+    nodes_start = {s: 0}
+    nodes_goal = {g: 0}
+    depth_start = depth_goal = 0
+    expanded = generated = max_frontier = 0
+    meeting, best = (s, 0) if s == g else (None, INF)
+    track = stats is not None
+
+    if track:
+        stats.phase('search')
+    try:
+        while frontier_start and frontier_goal and best > depth_start + depth_goal + 1:
+            forward = len(frontier_start) <= len(frontier_goal)
+            if forward:
+                frontier, nodes, other, depth = frontier_start, nodes_start, nodes_goal, depth_start
+            else:
+                frontier, nodes, other, depth = frontier_goal, nodes_goal, nodes_start, depth_goal
+            depth += 1
+            rec = depth << 2
+            layer = []
+            for code in frontier:
+                expanded += 1
+                if control is not None and not expanded & CHECK_MASK:
+                    control.tick(len(frontier) + len(layer))
+                children = moves[code >> bs]
+                generated += len(children)
+                for d, shift, mul, bx in children:
+                    child = code ^ ((code >> shift) & mask) * mul ^ bx
+                    if child not in nodes:
+                        nodes[child] = rec | d
+                        layer.append(child)
+                        seen = other.get(child)
+                        if seen is not None and depth + (seen >> 2) < best:
+                            best, meeting = depth + (seen >> 2), child
+            if forward:
+                frontier_start, depth_start = layer, depth
+            else:
+                frontier_goal, depth_goal = layer, depth
+            if track and len(frontier_start) + len(frontier_goal) > max_frontier:
+                max_frontier = len(frontier_start) + len(frontier_goal)
+    finally:
+        if track:
+            closed = len(nodes_start) + len(nodes_goal)
+            stats.add(expanded, generated, generated - closed + 2, 0, max_frontier, closed)
+            stats.phase('reconstruct')
+    result = reconstruct_bidirectional_path(meeting, s, g, nodes_start, nodes_goal, bd) if meeting is not None else None
+    if track:
+        stats.done()
+    return result
+
+def reconstruct_bidirectional_path(meeting, s, g, nodes_start, nodes_goal, bd):
+    # Forward half: start -> meeting
+    codes, dirs = trace(nodes_start, s, meeting, bd)
+    # Backward half was searched from the goal; walk it in reverse, inverting each move
+    back_codes, back_dirs = trace(nodes_goal, g, meeting, bd)
+    codes += back_codes[-2::-1]
+    dirs += [d ^ 1 for d in reversed(back_dirs)]
+    return to_result(codes, dirs, bd)
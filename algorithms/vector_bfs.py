@@ -0,0 +1,123 @@
+# Layer-synchronous BFS over NumPy arrays for the 3x3 board (NumPy is an
+# optional dependency; nothing else imports this module eagerly). A whole
+# frontier layer is one uint64 array of packed states: each move direction
+# produces the children of every state whose blank allows it in one vector
+# expression, using per-blank copies of BOARD.moves. Visited states are a
+# uint8 distance array indexed by permutation rank (255 = unseen), and the
+# blank move that first reached each rank is kept in a parallel uint8 array,
+# so paths are rebuilt by undoing moves from the goal.
+import numpy as np
+from math import factorial
+from utils.puzzle_utils import BOARD, pack, unpack, rank, apply_move, to_result, board_of
+
+UNSEEN = 0xFF
+SIZE = factorial(BOARD.cells)  # 9! ranks; half are reachable from any state
+
+def _move_tables(bd):
+    # valid/shift/mul/bx[d][blank] as arrays, so a layer indexes them by its blanks
+    valid = np.zeros((4, bd.cells), bool)
+    shift, mul, bx = (np.zeros((4, bd.cells), np.uint64) for _ in range(3))
+    for b, moves in enumerate(bd.moves):
+        for d, sh, mu, x in moves:
+            valid[d, b] = True
+            shift[d, b], mul[d, b], bx[d, b] = sh, mu, x
+    return valid, shift, mul, bx
+
+VALID, SHIFT, MUL, BX = _move_tables(BOARD)
+WEIGHTS = [factorial(BOARD.cells - 1 - i) for i in range(BOARD.cells)]
+MASK = np.uint64(BOARD.mask)
+BLANK_SHIFT = np.uint64(BOARD.blank_shift)
+# POPCOUNT[m] = set bits in a mask of seen tiles
+POPCOUNT = np.array([bin(m).count('1') for m in range(1 << BOARD.cells)], np.int32)
+
+def ranks(codes):
+    # Lehmer rank of every packed state in `codes` (same as puzzle_utils.rank):
+    # the digit for position i is the number of smaller tiles not seen yet
+    seen = np.zeros(len(codes), np.int32)
+    r = np.zeros(len(codes), np.int32)
+    for i in range(BOARD.cells - 1):
+        t = ((codes >> np.uint64(BOARD.bits * i)) & MASK).astype(np.int32)
+        bit = np.left_shift(1, t, dtype=np.int32)
+        r += (t - POPCOUNT[seen & (bit - 1)]) * WEIGHTS[i]
+        seen |= bit
+    return r
+
+def expand(layer):
+    # (children, moves) of every state in `layer`, duplicates included
+    blanks = (layer >> BLANK_SHIFT).astype(np.intp)
+    children, dirs = [], []
+    for d in range(4):
+        ok = VALID[d, blanks]
+        codes, b = layer[ok], blanks[ok]
+        children.append(codes ^ ((codes >> SHIFT[d, b]) & MASK) * MUL[d, b] ^ BX[d, b])
+        dirs.append(np.full(len(codes), d, np.uint8))
+    return np.concatenate(children), np.concatenate(dirs)
+
+def search(root, target=None, control=None, stats=None):
+    # BFS from packed `root` until the rank `target` is reached (or the whole
+    # component is enumerated); returns (dist, parent) arrays indexed by rank
+    dist = np.full(SIZE, UNSEEN, np.uint8)
+    parent = np.full(SIZE, UNSEEN, np.uint8)
+    slot = np.empty(SIZE, np.int32)  # scratch: which child claimed a rank this layer
+    dist[rank(unpack(root))] = 0
+    layer = np.array([root], np.uint64)
+    depth = expanded = generated = max_frontier = 0
+    closed = 1
+    try:
+        while len(layer) and (target is None or dist[target] == UNSEEN):
+            expanded += len(layer)
+            max_frontier = max(max_frontier, len(layer))
+            if control is not None:
+                control.report(expanded, len(layer))
+            children, dirs = expand(layer)
+            generated += len(children)
+            r = ranks(children)
+            new = dist[r] == UNSEEN
+            children, dirs, r = children[new], dirs[new], r[new]
+            # children reaching the same rank: the last write wins, and only it is kept
+            idx = np.arange(len(r), dtype=np.int32)
+            slot[r] = idx
+            keep = slot[r] == idx
+            layer, r = children[keep], r[keep]
+            depth += 1
+            dist[r] = depth
+            parent[r] = dirs[keep]
+            closed += len(layer)
+    finally:
+        if stats is not None:
+            stats.add(expanded, generated, generated - closed + 1, 0, max_frontier, closed)
+    return dist, parent
+
+def distances(goal):
+    # uint8 optimal distance from every rank to `goal`, UNSEEN if unreachable
+    if board_of(goal) is not BOARD:
+        raise ValueError('vector BFS supports the 3x3 board only')
+    return search(pack(goal))[0]
+
+def layered_bfs(start, goal, control=None, stats=None):
+    if board_of(start) is not BOARD:
+        raise ValueError('vector BFS supports the 3x3 board only')
+    if stats is not None:
+        stats.phase('setup')
+    s, g = pack(start), pack(goal)
+    if stats is not None:
+        stats.phase('search')
+    try:
+        dist, parent = search(s, rank(goal), control, stats)
+    finally:
+        if stats is not None:
+            stats.phase('reconstruct')
+    result = None
+    if dist[rank(goal)] != UNSEEN:
+        codes, dirs = [g], []
+        code = g
+        while code != s:
+            d = int(parent[rank(unpack(code))])
+            code = apply_move(code, d ^ 1)
+            codes.append(code)
+            dirs.append(d)
+        codes.reverse(); dirs.reverse()
+        result = to_result(codes, dirs)
+    if stats is not None:
+        stats.done()
+    return result
@@ -0,0 +1,71 @@
+# Microbenchmark for node expansion: nodes/second for the old list-copying
+# tuple generator versus the MOVES table over packed states.
+# Run from the project root: python -m benchmarks.expansion_bench
+import sys
+import time
+from collections import deque
+from utils.puzzle_utils import pack, MOVES, BLANK_SHIFT
+
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 0)
+
+def legacy_neighbors(state):
+    # the pre-table implementation, kept here as the "before" reference
+    s = list(state)
+    i = s.index(0)
+    r, c = divmod(i, 3)
+    moves = []
+    def swap_and_make(newi, action):
+        ns = s.copy()
+        ns[i], ns[newi] = ns[newi], ns[i]
+        return (tuple(ns), action)
+    if r > 0:
+        newi = (r-1)*3 + c
+        moves.append(swap_and_make(newi, f'Move {s[newi]} down'))
+    if r < 2:
+        newi = (r+1)*3 + c
+        moves.append(swap_and_make(newi, f'Move {s[newi]} up'))
+    if c > 0:
+        newi = r*3 + (c-1)
+        moves.append(swap_and_make(newi, f'Move {s[newi]} right'))
+    if c < 2:
+        newi = r*3 + (c+1)
+        moves.append(swap_and_make(newi, f'Move {s[newi]} left'))
+    return moves
+
+def sample_states(n):
+    # first n states in BFS order from the goal
+    g = pack(GOAL)
+    seen, frontier, out = {g}, deque([g]), []
+    while frontier and len(out) < n:
+        code = frontier.popleft()
+        out.append(code)
+        for d, shift, mul, bx in MOVES[code >> BLANK_SHIFT]:
+            child = code ^ ((code >> shift) & 15) * mul ^ bx
+            if child not in seen:
+                seen.add(child)
+                frontier.append(child)
+    return out
+
+def bench_legacy(states):
+    t0 = time.perf_counter()
+    for s in states:
+        for ns, mv in legacy_neighbors(s):
+            pass
+    return time.perf_counter() - t0
+
+def bench_table(codes):
+    t0 = time.perf_counter()
+    for code in codes:
+        for d, shift, mul, bx in MOVES[code >> BLANK_SHIFT]:
+            child = code ^ ((code >> shift) & 15) * mul ^ bx
+    return time.perf_counter() - t0
+
+def main(n=100000):
+    codes = sample_states(n)
+    states = [tuple((c >> (4 * i)) & 15 for i in range(9)) for c in codes]
+    for name, fn, arg in (('legacy tuple', bench_legacy, states), ('move table', bench_table, codes)):
+        dt = min(fn(arg) for _ in range(3))
+        print(f'{name:14s} {len(arg) / dt:12,.0f} nodes/s')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
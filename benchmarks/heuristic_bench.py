@@ -0,0 +1,46 @@
+# Heuristic comparison: A* nodes expanded, node reduction against Manhattan
+# distance and time per expanded node for every heuristics_map entry, on the
+# 3x3 depth-bucketed corpus and on random-walk 15-puzzles. Table builds (PDB,
+# walking distance) happen before timing starts.
+# Run from the project root: python -m benchmarks.heuristic_bench [per_bucket] [walk]
+import sys
+import time
+from algorithms.informed_searches import a_star
+from benchmarks.parallel_bench import instances
+from benchmarks.suite import corpus
+from utils.heuristics import heuristics_map, evaluator_of
+from utils.puzzle_utils import BOARD
+from utils.search_stats import SearchStats
+
+def run(goal, starts, names):
+    print(f'{"heuristic":18s} {"expanded":>10s} {"vs manhattan":>12s} {"time":>8s} {"us/node":>8s}')
+    base = None
+    names = sorted(names, key=lambda n: n != 'manhattan')  # the baseline first
+    for name in names:
+        h = heuristics_map[name]
+        try:
+            evaluator_of(h, goal)
+        except ValueError as e:
+            print(f'{name:18s} skipped: {e}')
+            continue
+        stats = SearchStats()
+        t0 = time.perf_counter()
+        for s in starts:
+            a_star(s, goal, h, stats=stats)
+        dt = time.perf_counter() - t0
+        if name == 'manhattan':
+            base = stats.expanded
+        ratio = f'{stats.expanded / base:.1%}'
+        print(f'{name:18s} {stats.expanded:10,d} {ratio:>12s} {dt:8.2f} {dt / stats.expanded * 1e6:8.1f}')
+
+def main(per_bucket=10, walk=60):
+    starts = [s for d, b in corpus(0, per_bucket, (20, 24, 28)).items() for s in b]
+    print(f'3x3: {len(starts)} puzzles at optimal depth 20-28')
+    run(BOARD.goal, starts, list(heuristics_map))
+    goal, starts = instances(count=5, walk=walk)
+    print(f'\n4x4: {len(starts)} puzzles, {walk}-move random walks')
+    # pdb663's 6-tile tables take too long to build for a benchmark run
+    run(goal, starts, [n for n in heuristics_map if n not in ('misplaced', 'exact', 'pdb663')])
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
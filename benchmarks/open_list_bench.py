@@ -0,0 +1,37 @@
+# Open-list benchmark: nodes expanded and time for A* / UCS with the old
+# heap order (lowest g first among equal f), the heap preferring high g, and
+# the bucket queue. Run from the project root: python -m benchmarks.open_list_bench
+import heapq
+import sys
+import time
+from algorithms.informed_searches import _best_first, heuristics_map
+from benchmarks.suite import corpus
+from utils.open_list import BucketQueue, HeapQueue
+from utils.puzzle_utils import BOARD
+from utils.search_stats import SearchStats
+
+class LegacyHeap(HeapQueue):
+    # (f, g, code, h) entries as the searches pushed them before open lists
+    def push(self, f, g, code, h):
+        heapq.heappush(self.heap, (f, g, code, h))
+
+    def pop(self):
+        return heapq.heappop(self.heap)
+
+QUEUES = (('heap, low g', LegacyHeap), ('heap, high g', HeapQueue), ('buckets', BucketQueue))
+CASES = (('ucs', None), ('a_star/misplaced', heuristics_map['misplaced']), ('a_star/manhattan', heuristics_map['manhattan']))
+
+def main(per_bucket=5, depths=(16, 20, 24)):
+    goal = BOARD.goal
+    starts = [s for d, b in corpus(0, per_bucket, depths).items() for s in b]
+    for name, h in CASES:
+        for qname, queue in QUEUES:
+            stats = SearchStats()
+            t0 = time.perf_counter()
+            for s in starts:
+                _best_first(s, goal, h, stats=stats, queue=queue)
+            dt = time.perf_counter() - t0
+            print(f'{name:18s} {qname:13s} {stats.expanded:10,d} expanded {stats.stale_pops:9,d} stale {dt:8.3f} s')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
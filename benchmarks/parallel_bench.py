@@ -0,0 +1,44 @@
+# HDA* scaling: expansions/second of hda_star for 1, 2, 4, ... workers
+# against single-process a_star, on fixed random-walk 15-puzzle instances.
+# Run from the project root: python -m benchmarks.parallel_bench [max_workers] [walk]
+import os
+import random
+import sys
+import time
+from algorithms.informed_searches import a_star, hda_star, heuristics_map
+from utils.puzzle_utils import board, pack, unpack, apply_move
+from utils.search_stats import SearchStats
+
+def instances(count=3, walk=400, seed=0, n=4):
+    bd = board(n)
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(count):
+        code = pack(bd.goal)
+        for _ in range(walk):
+            code = apply_move(code, rnd.choice(bd.legal[code >> bd.blank_shift])[0], bd)
+        out.append(unpack(code, bd))
+    return bd.goal, out
+
+def measure(fn, starts, goal):
+    stats = SearchStats()
+    t0 = time.perf_counter()
+    lengths = [len(fn(s, goal, stats)[1]) for s in starts]
+    dt = time.perf_counter() - t0
+    return lengths, stats.expanded, dt
+
+def main(max_workers=None, walk=400):
+    max_workers = max_workers or os.cpu_count() or 1
+    h = heuristics_map['manhattan']
+    goal, starts = instances(walk=walk)
+    lengths, expanded, dt = measure(lambda s, g, st: a_star(s, g, h, stats=st), starts, goal)
+    print(f'a_star       {expanded:10,d} expanded {dt:8.2f} s {expanded / dt:10,.0f} nodes/s  moves {lengths}')
+    w = 1
+    while w <= max_workers:
+        got, expanded, dt = measure(lambda s, g, st: hda_star(s, g, h, workers=w, stats=st), starts, goal)
+        assert got == lengths, 'hda_star returned a non-optimal path'
+        print(f'hda_star x{w:<3d} {expanded:10,d} expanded {dt:8.2f} s {expanded / dt:10,.0f} nodes/s')
+        w *= 2
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
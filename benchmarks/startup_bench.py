@@ -0,0 +1,50 @@
+# Startup time of the entry points, each in a fresh interpreter: the headless
+# CLI solving a one-move puzzle, its import alone, the GUI's imports (without
+# opening a window) and a bare interpreter for reference. Also lists the
+# slowest imports of the headless CLI from python -X importtime.
+# Run from the project root: python -m benchmarks.startup_bench [repeats]
+import statistics
+import subprocess
+import sys
+import time
+
+CASES = (
+    ('python (bare)', ['-c', 'pass']),
+    ('import cli.solve', ['-c', 'import cli.solve']),
+    ('python -m cli', ['-m', 'cli', '123456708']),
+    ('import ui.app_window', ['-c', 'import ui.app_window']),
+)
+
+def measure(args, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, *args], capture_output=True)
+        times.append(time.perf_counter() - t0)
+        if proc.returncode:
+            return None
+    return times
+
+def slowest_imports(args, count=8):
+    # (cumulative us, module) of the top-level imports, largest first
+    err = subprocess.run([sys.executable, '-X', 'importtime', *args], capture_output=True, text=True).stderr
+    rows = []
+    for line in err.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit() and parts[2].startswith(' ') and not parts[2].startswith('  '):
+            rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:count]
+
+def main(repeats=10):
+    for name, args in CASES:
+        times = measure(args, repeats)
+        if times is None:
+            print(f'{name:22s} failed (is tkinter installed?)')
+            continue
+        print(f'{name:22s} min {min(times) * 1000:7.1f} ms  median {statistics.median(times) * 1000:7.1f} ms')
+    print('slowest imports of python -m cli:')
+    for us, module in slowest_imports(['-m', 'cli', '123456708']):
+        print(f'  {us / 1000:7.1f} ms  {module}')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
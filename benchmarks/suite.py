@@ -0,0 +1,156 @@
+# Reproducible benchmark suite for every search function.
+#
+#   python -m benchmarks.suite --out bench.json                 # record a baseline
+#   python -m benchmarks.suite --compare bench.json --threshold 0.25
+#
+# A fixed-seed corpus of solvable 8-puzzles is bucketed by optimal solution
+# depth (from the perfect distance database). Each algorithm/heuristic pair
+# runs on every bucket up to its depth cap, recording wall time, nodes
+# expanded, peak frontier and peak traced memory. --compare exits with status
+# 1 when any metric grows by more than the threshold over the baseline.
+import argparse
+import inspect
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from algorithms import informed_searches, uninformed_searches
+from utils.distance_db import get_db
+from utils.puzzle_utils import BOARD, pack, unpack, MOVES, BLANK_SHIFT
+from utils.search_stats import SearchStats
+
+DEPTHS = (4, 8, 12, 16, 20, 24)
+# deepest bucket each algorithm is run on; the rest grow exponentially or wander
+DEPTH_CAP = {
+    'dls': 12, 'ids': 12, 'dfs': 16,
+    'ida_star/misplaced': 20, 'a_star/misplaced': 20,
+}
+METRICS = ('time', 'expanded', 'peak_frontier', 'peak_memory')
+MIN_TIME = 0.005  # timings below this are too noisy to flag
+
+def corpus(seed=0, per_bucket=5, depths=DEPTHS):
+    # {depth: [start, ...]} of random-walk starts with exactly that optimal depth
+    rnd = random.Random(seed)
+    goal = BOARD.goal
+    db = get_db()
+    buckets = {d: [] for d in depths}
+    seen = set()
+    while any(len(b) < per_bucket for b in buckets.values()):
+        code = pack(goal)
+        for _ in range(rnd.randrange(max(depths) * 2)):
+            code = rnd.choice([code ^ ((code >> shift) & 15) * mul ^ bx for d, shift, mul, bx in MOVES[code >> BLANK_SHIFT]])
+        state = unpack(code)
+        depth = db.distance(state, goal)
+        if depth in buckets and len(buckets[depth]) < per_bucket and state not in seen:
+            seen.add(state)
+            buckets[depth].append(state)
+    return buckets
+
+def algorithms():
+    # (name, call(start, goal, stats)) for every public search, with each heuristic
+    for module in (uninformed_searches, informed_searches):
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith('_') or fn.__module__ != module.__name__:
+                continue
+            params = inspect.signature(fn).parameters
+            if 'stats' not in params:
+                continue
+            if 'heuristic' in params:
+                for hname, h in informed_searches.heuristics_map.items():
+                    yield f'{name}/{hname}', _bind(fn, heuristic=h)
+            elif name == 'dls':
+                yield name, None  # needs the instance depth; see run_one
+            else:
+                yield name, _bind(fn)
+
+def _bind(fn, **kwargs):
+    return lambda start, goal, stats: fn(start, goal, stats=stats, **kwargs)
+
+def run_one(name, call, start, goal, depth, memory=True):
+    if call is None:
+        call = lambda s, g, stats: uninformed_searches.dls(s, g, depth, stats=stats)
+    stats = SearchStats()
+    t0 = time.perf_counter()
+    result = call(start, goal, stats)
+    elapsed = time.perf_counter() - t0
+    row = {'time': elapsed, 'expanded': stats.expanded, 'peak_frontier': stats.max_frontier, 'moves': len(result[1]) if result else None}
+    if memory:
+        tracemalloc.start()
+        call(start, goal, None)
+        row['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return row
+
+def run(seed=0, per_bucket=5, memory=True, only=None, log=sys.stderr):
+    goal = BOARD.goal
+    buckets = corpus(seed, per_bucket)
+    results = {}
+    for name, call in algorithms():
+        if only and not any(o in name for o in only):
+            continue
+        cap = DEPTH_CAP.get(name, DEPTH_CAP.get(name.split('/')[0], max(DEPTHS)))
+        for depth, starts in buckets.items():
+            if depth > cap:
+                continue
+            try:
+                rows = [run_one(name, call, s, goal, depth, memory) for s in starts]
+            except (ImportError, ValueError) as e:
+                # an optional dependency is missing (vector_bfs raises ValueError
+                # without NumPy) or the heuristic does not fit this board
+                print(f'{name:32s} skipped: {e}', file=log)
+                break
+            agg = {m: sum(r[m] for r in rows) / len(rows) for m in METRICS if m in rows[0]}
+            agg['moves'] = [r['moves'] for r in rows]
+            results[f'{name}@{depth}'] = agg
+            print(f'{name:32s} depth {depth:2d}  {agg["time"] * 1000:9.2f} ms  {agg["expanded"]:9.0f} nodes', file=log)
+    return {'seed': seed, 'per_bucket': per_bucket, 'results': results}
+
+def compare(current, baseline, threshold):
+    # list of regression messages for metrics worse than baseline * (1 + threshold)
+    problems = []
+    for key, base in baseline['results'].items():
+        cur = current['results'].get(key)
+        if cur is None:
+            continue
+        for m in METRICS:
+            if m not in base or m not in cur or base[m] <= 0:
+                continue
+            if m == 'time' and max(base[m], cur[m]) < MIN_TIME:
+                continue
+            if cur[m] > base[m] * (1 + threshold):
+                problems.append(f'{key} {m}: {base[m]:.6g} -> {cur[m]:.6g} (+{cur[m] / base[m] - 1:.0%})')
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark every search algorithm on a fixed corpus.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--per-bucket', type=int, default=5, help='instances per optimal depth')
+    parser.add_argument('--out', help='write results JSON here')
+    parser.add_argument('--compare', help='baseline JSON to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative slowdown (0.25 = 25%%)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--only', nargs='*', help='substrings of algorithm names to run')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        args.seed, args.per_bucket = baseline['seed'], baseline['per_bucket']
+
+    current = run(args.seed, args.per_bucket, not args.no_memory, args.only)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(current, f, indent=1, sort_keys=True)
+    if baseline is not None:
+        problems = compare(current, baseline, args.threshold)
+        for p in problems:
+            print('REGRESSION', p)
+        if problems:
+            sys.exit(1)
+        print('no regressions')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+# python -m cli <start> [options]   solve one puzzle (cli.solve)
+# python -m cli batch ...           same as python -m cli.batch
+# python -m cli serve ...           same as python -m cli.server
+import sys
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['batch']:
+        from cli.batch import main as run
+    elif argv[:1] == ['serve']:
+        from cli.server import main as run
+    else:
+        from cli.solve import main as solve
+        return solve(argv)
+    run(argv[1:])
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+# Headless batch solver. Reads JSON Lines of {"start": [...], "goal": [...]}
+# (an optional "id" is echoed back) from a file or stdin, solves them on a
+# process pool and streams one JSON result per line, in input order.
+#
+#   python -m cli.batch puzzles.jsonl --algorithm a_star --heuristic manhattan -j 8
+#
+# At most `workers * window` puzzles are in flight, so memory does not grow
+# with the corpus. Worker processes live for the whole run, so per-goal
+# tables (heuristic deltas, distance databases) are built once per worker;
+# heuristics keep the tables of their most recently used goals.
+# With --cache, optimal algorithms share a persistent SolutionCache.
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+
+from algorithms import registry
+from utils.puzzle_utils import board_of, validate_state
+from utils.search_control import SearchControl, BudgetExceeded
+from utils.search_stats import SearchStats
+
+# searches that always return an optimal path, and may use the solution cache
+OPTIMAL = {a.name for a in registry.ALGORITHMS if a.optimal}
+_caches = {}  # per-process SolutionCache by path
+
+def resolve_algorithm(name):
+    # any registered search, by function name; imports its module
+    if name not in registry.BY_NAME:
+        raise ValueError(f'unknown algorithm: {name}')
+    return registry.BY_NAME[name].load()
+
+def solve_one(record, algorithm, heuristic, with_moves=False, with_stats=False, cache=None, max_nodes=None, max_time=None,
+              options=None):
+    # runs in a worker; returns a JSON-ready result dict. A search that runs out
+    # of its node or time budget reports solved: false and which budget ran out.
+    # `options` are registry options such as {'limit': 20} or {'weight': 2.0}.
+    out = {'id': record.get('id')}
+    try:
+        if 'start' not in record or 'goal' not in record:
+            raise ValueError('record needs start and goal')
+        start, goal = tuple(record['start']), tuple(record['goal'])
+        if not (validate_state(start) and validate_state(goal, board_of(start).n)):
+            raise ValueError('start and goal must be permutations of 0..n*n-1 on the same n x n board')
+        fn = resolve_algorithm(algorithm)
+        entry = registry.BY_NAME[algorithm]
+        kwargs = {}
+        if entry.heuristic:
+            kwargs['heuristic'] = registry.heuristic(heuristic)
+        stats = SearchStats() if with_stats else None
+        if stats is not None:
+            kwargs['stats'] = stats
+        if max_nodes is not None or max_time is not None:
+            kwargs['control'] = SearchControl(max_nodes=max_nodes, max_time=max_time)
+        options = options or {}
+        for key in entry.required():
+            if options.get(key) is None:
+                raise ValueError(f'{algorithm} needs the {key} option')
+        for key, value in options.items():
+            if key in entry.options and value is not None:
+                kwargs[entry.options[key][0]] = value
+        if 'on_solution' in entry.options:
+            # anytime searches and portfolios: report the proven bound of the
+            # returned solution, and which search found it
+            def on_solution(result, bound, source=None):
+                out['bound'] = round(bound, 4) if bound != float('inf') else None
+                if source is not None:
+                    out['winner'] = source
+            kwargs['on_solution'] = on_solution
+        t0 = time.perf_counter()
+        try:
+            if cache is not None and algorithm in OPTIMAL:
+                if cache not in _caches:
+                    from utils.solution_cache import SolutionCache
+                    _caches[cache] = SolutionCache(cache)
+                result = _caches[cache].solve(fn, start, goal, **kwargs)
+            else:
+                result = fn(start, goal, **kwargs)
+        except BudgetExceeded as e:
+            result = None
+            out['budget_exceeded'] = str(e)
+        out['time'] = round(time.perf_counter() - t0, 6)
+    except (KeyError, TypeError, ValueError) as e:
+        out['error'] = str(e)
+        return out
+    except Exception as e:
+        # anything else (a missing optional module, a cache I/O error, a failed
+        # worker process) still fails only this puzzle
+        out['error'] = f'{type(e).__name__}: {e}'
+        return out
+    out['solved'] = result is not None
+    out['move_count'] = len(result[1]) if result is not None else None
+    if with_moves and result is not None:
+        out['moves'] = result[1]
+    if stats is not None:
+        out['stats'] = stats.as_dict()
+    return out
+
+def read_records(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {'error': f'invalid JSON: {e}'}
+            continue
+        yield rec if isinstance(rec, dict) else {'error': 'expected a JSON object'}
+
+def run(records, out, algorithm='a_star', heuristic='manhattan', workers=None, window=4, with_moves=False, with_stats=False, cache=None,
+        max_nodes=None, max_time=None, options=None):
+    # stream results to `out` in input order; workers=0 solves in-process.
+    # `options` (e.g. {'limit': 20}) go to every solve_one call.
+    resolve_algorithm(algorithm)
+    def emit(res):
+        out.write(json.dumps(res) + '\n')
+        out.flush()
+
+    if workers == 0:
+        for rec in records:
+            emit(rec if 'error' in rec else solve_one(rec, algorithm, heuristic, with_moves, with_stats, cache, max_nodes, max_time,
+                                                          options))
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # not needed for in-process runs
+    workers = workers or os.cpu_count() or 1
+    built = set()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        limit = workers * window
+        pending = deque()
+        for rec in records:
+            if 'error' in rec:
+                pending.append(rec)
+            else:
+                prepare_goal(rec, algorithm, heuristic, built)
+                pending.append(pool.submit(solve_one, rec, algorithm, heuristic, with_moves, with_stats, cache,
+                                           max_nodes, max_time, options))
+            while len(pending) >= limit or (pending and _ready(pending[0])):
+                emit(_result(pending.popleft()))
+        while pending:
+            emit(_result(pending.popleft()))
+
+def prepare_goal(record, algorithm, heuristic, built):
+    # build a goal's pattern-database tables here, before its first puzzle goes
+    # to the pool, rather than in every worker at once. Bad records and
+    # heuristics that do not fit are left for solve_one to report.
+    entry = registry.BY_NAME[algorithm]
+    try:
+        goal = tuple(record['goal'])
+        if not entry.heuristic or goal in built or not validate_state(goal):
+            return
+        built.add(goal)
+        from utils.heuristics import build_tables
+        build_tables(registry.heuristic(heuristic), goal)
+    except (KeyError, TypeError, ValueError):
+        pass
+
+def check_options(parser, algorithm, options):
+    # parser.error for a required option left out or an invalid weight
+    missing = registry.BY_NAME[algorithm].required()
+    for key in missing:
+        if options.get(key) is None:
+            parser.error(f'{algorithm} needs --{key}')
+    weight = options.get('weight')
+    if weight is not None and not registry.valid_weight(algorithm, weight):
+        parser.error('--weight must be a finite number of at least 1 (inf only as the portfolio bound)')
+
+def _ready(item):
+    return isinstance(item, dict) or item.done()
+
+def _result(item):
+    return item if isinstance(item, dict) else item.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve a JSON Lines corpus of sliding puzzles.')
+    parser.add_argument('input', nargs='?', default='-', help="JSONL file, or '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="output JSONL file, or '-' for stdout")
+    parser.add_argument('-a', '--algorithm', default='a_star', help='search function name, e.g. bfs, a_star, ida_star')
+    parser.add_argument('--heuristic', default='manhattan', help='heuristics_map key for informed searches')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes (default: CPU count, 0: in-process)')
+    parser.add_argument('--window', type=int, default=4, help='puzzles in flight per worker')
+    parser.add_argument('--moves', action='store_true', help='include the move list in each result')
+    parser.add_argument('--stats', action='store_true', help='include search statistics in each result')
+    parser.add_argument('--cache', help='SQLite solution cache for optimal algorithms')
+    parser.add_argument('--max-nodes', type=int, help='give up on a puzzle after this many expansions')
+    parser.add_argument('--max-time', type=float, help='give up on a puzzle after this many seconds')
+    parser.add_argument('--limit', type=int, help='depth limit for dls, stored-node cap for memory_bounded_a_star')
+    parser.add_argument('--weight', type=float, help='heuristic weight for weighted_a_star and ara_star, suboptimality bound for portfolio (inf: any)')
+    args = parser.parse_args(argv)
+
+    try:
+        resolve_algorithm(args.algorithm)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.heuristic not in registry.HEURISTICS:
+        parser.error(f'unknown heuristic: {args.heuristic}')
+    options = {'limit': args.limit, 'weight': args.weight}
+    check_options(parser, args.algorithm, options)
+
+    src = sys.stdin if args.input == '-' else open(args.input)
+    dst = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        run(read_records(src), dst, args.algorithm, args.heuristic, args.workers, args.window, args.moves, args.stats, args.cache,
+            args.max_nodes, args.max_time, options)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+# Local solver daemon: a small HTTP/1.1 JSON API on asyncio, over TCP
+# (127.0.0.1 by default) or a Unix socket. Solves run on a long-lived process
+# pool, so heuristic tables, pattern/distance databases and the solution
+# cache stay warm between requests.
+#
+#   python -m cli.server --port 8765 -j 4
+#   python -m cli.server --unix /tmp/puzzle.sock
+#   curl -s localhost:8765/solve -d '{"start": [8,6,7,2,5,4,3,0,1], "goal": [1,2,3,4,5,6,7,8,0]}'
+#
+# GET  /health      {"status": "ok", "workers": n, "in_flight": k}
+# GET  /algorithms  {"algorithms": [...], "heuristics": [...]}
+# POST /solve       {"start": [...], "goal": [...], "algorithm": "a_star",
+#                    "heuristic": "manhattan", "moves": false, "stats": false,
+#                    "max_nodes": null, "max_time": null, "limit": null,
+#                    "weight": null, "id": null}
+#                   -> the cli.batch result object, plus "coalesced": true
+#                      when it was shared with an identical request in flight
+#
+# Identical /solve requests that arrive while one is running wait on the same
+# computation instead of starting their own.
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from algorithms import registry
+from cli.batch import prepare_goal, resolve_algorithm, solve_one
+from utils.solution_cache import DEFAULT_PATH
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+MAX_BODY = 1 << 20
+
+def algorithm_names():
+    return [a.name for a in registry.ALGORITHMS]
+
+def _warm():
+    # pool initializer: build the common per-goal tables before the first request
+    goal = (1, 2, 3, 4, 5, 6, 7, 8, 0)
+    for h in (registry.heuristic('manhattan'), registry.heuristic('misplaced')):
+        h.deltas(goal)
+
+def parse_request(body):
+    # validated solve_one arguments from a /solve body: (id, positional
+    # arguments, budgets, registry options); raises ValueError
+    try:
+        req = json.loads(body or b'{}')
+    except json.JSONDecodeError as e:
+        raise ValueError(f'invalid JSON: {e}')
+    if not isinstance(req, dict) or 'start' not in req or 'goal' not in req:
+        raise ValueError('body must be an object with "start" and "goal"')
+    algorithm = req.get('algorithm', 'a_star')
+    heuristic = req.get('heuristic', 'manhattan')
+    resolve_algorithm(algorithm)
+    if heuristic not in registry.HEURISTICS:
+        raise ValueError(f'unknown heuristic: {heuristic}')
+    budgets = []
+    for key, kind in (('max_nodes', int), ('max_time', (int, float))):
+        value = req.get(key)
+        if value is not None and (not isinstance(value, kind) or isinstance(value, bool) or value <= 0):
+            raise ValueError(f'{key} must be a positive number')
+        budgets.append(value)
+    limit, weight = req.get('limit'), req.get('weight')
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 0):
+        raise ValueError('limit must be a non-negative integer')
+    if weight is not None and (not isinstance(weight, (int, float)) or isinstance(weight, bool)
+                               or not registry.valid_weight(algorithm, weight)):
+        raise ValueError('weight must be a finite number of at least 1 (inf only as the portfolio bound)')
+    options = {'limit': limit, 'weight': weight}
+    for key in registry.get(algorithm).required():
+        if options[key] is None:
+            raise ValueError(f'{algorithm} needs "{key}"')
+    record = {'start': req['start'], 'goal': req['goal']}
+    return req.get('id'), (record, algorithm, heuristic, bool(req.get('moves')), bool(req.get('stats'))), budgets, options
+
+class SolverServer:
+    def __init__(self, workers=None, cache=DEFAULT_PATH):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
+        self.pool = None
+        self.in_flight = {}  # request key -> Future shared by identical requests
+        self.tables = {}     # (heuristic, goal) -> Future of its table build
+
+    async def build_tables(self, record, algorithm, heuristic):
+        # a goal's pattern-database tables are built once, on a thread of this
+        # process, before its first request reaches the pool, instead of by
+        # every worker at the same time
+        if not registry.get(algorithm).heuristic:
+            return
+        try:
+            key = (heuristic, tuple(record['goal']))
+            fut = self.tables.get(key)
+        except TypeError:
+            return  # not a valid goal; solve_one reports it
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = self.tables[key] = loop.run_in_executor(None, prepare_goal, record, algorithm, heuristic, set())
+        await asyncio.shield(fut)
+
+    async def solve(self, args, budgets, options=None):
+        # (result, coalesced); identical in-flight requests share one future
+        key = json.dumps([args, budgets, options], sort_keys=True)
+        fut = self.in_flight.get(key)
+        if fut is not None:
+            return await asyncio.shield(fut), True
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(self.pool, solve_one, *args, self.cache, *budgets, options)
+        self.in_flight[key] = fut
+        try:
+            return await asyncio.shield(fut), False
+        finally:
+            self.in_flight.pop(key, None)
+
+    async def route(self, method, path, body):
+        if path == '/health':
+            return 200, {'status': 'ok', 'workers': self.workers, 'in_flight': len(self.in_flight)}
+        if path == '/algorithms':
+            return 200, {'algorithms': algorithm_names(), 'heuristics': list(registry.HEURISTICS)}
+        if path != '/solve':
+            return 404, {'error': f'no such endpoint: {path}'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+        try:
+            rid, args, budgets, options = parse_request(body)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        await self.build_tables(*args[:3])
+        result, coalesced = await self.solve(args, budgets, options)
+        result = dict(result, id=rid)
+        if coalesced:
+            result['coalesced'] = True
+        return (400 if 'error' in result else 200), result
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                method, target, _ = (await reader.readline()).decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    raise ValueError('request body too large')
+                body = await reader.readexactly(length)
+            except (ValueError, asyncio.IncompleteReadError) as e:
+                status, payload = 400, {'error': f'malformed request: {e}'}
+            else:
+                try:
+                    status, payload = await self.route(method.upper(), target.split('?', 1)[0], body)
+                except Exception as e:
+                    status, payload = 500, {'error': f'{type(e).__name__}: {e}'}
+            data = json.dumps(payload).encode()
+            writer.write(f'HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n'
+                         f'Content-Length: {len(data)}\r\nConnection: close\r\n\r\n'.encode() + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix=None):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm)
+        try:
+            if unix:
+                server = await asyncio.start_unix_server(self.handle, path=unix)
+            else:
+                server = await asyncio.start_server(self.handle, host, port)
+            where = unix or '%s:%d' % server.sockets[0].getsockname()[:2]
+            print(f'solver listening on {where} with {self.workers} workers', flush=True)
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            if unix and os.path.exists(unix):
+                os.unlink(unix)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the puzzle solvers over a local JSON API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='listen on this Unix socket path instead of TCP')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='solver processes (default: CPU count)')
+    parser.add_argument('--cache', default=DEFAULT_PATH, help='SQLite solution cache for optimal algorithms')
+    parser.add_argument('--no-cache', action='store_true', help='do not use the solution cache')
+    args = parser.parse_args(argv)
+    server = SolverServer(args.workers, None if args.no_cache else args.cache)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
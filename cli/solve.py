@@ -0,0 +1,72 @@
+# Headless single-puzzle solver. Never imports tkinter, and only the chosen
+# search's module (through algorithms.registry), so it starts quickly enough
+# to call from scripts. `python -m cli` runs this; `python main.py` with
+# arguments does too.
+#
+#   python -m cli 867254301 --goal 123456780 -a ida_star
+#   python -m cli 5,1,2,3,9,6,7,4,13,10,11,8,14,15,0,12 --heuristic pdb --json
+import argparse
+import json
+import sys
+
+from algorithms import registry
+from cli.batch import check_options, solve_one
+from utils.puzzle_utils import board_of, validate_state
+
+def parse_state(text):
+    # '867254301' (3x3 only) or comma/space separated tiles
+    parts = text.replace(',', ' ').split()
+    if len(parts) == 1 and len(text) == 9:
+        parts = list(text)
+    try:
+        return tuple(int(p) for p in parts)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'not a puzzle state: {text!r}')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m cli', description='Solve one sliding puzzle without the GUI.')
+    parser.add_argument('start', type=parse_state, help="tiles row by row, 0 for the blank: '867254301' or '8,6,7,...'")
+    parser.add_argument('-g', '--goal', type=parse_state, help='goal state (default: 1..n*n-1 then the blank)')
+    parser.add_argument('-a', '--algorithm', default='a_star', help='search function name: ' + ', '.join(registry.BY_NAME))
+    parser.add_argument('--heuristic', default='manhattan', help=', '.join(registry.HEURISTICS))
+    parser.add_argument('--limit', type=int, help='depth limit for dls, stored-node cap for memory_bounded_a_star')
+    parser.add_argument('--weight', type=float, help='heuristic weight for weighted_a_star and ara_star, suboptimality bound for portfolio (inf: any)')
+    parser.add_argument('--stats', action='store_true', help='print search statistics')
+    parser.add_argument('--json', action='store_true', help='print the cli.batch result object instead of text')
+    parser.add_argument('--cache', help='SQLite solution cache for optimal algorithms')
+    parser.add_argument('--max-nodes', type=int, help='give up after this many expansions')
+    parser.add_argument('--max-time', type=float, help='give up after this many seconds')
+    args = parser.parse_args(argv)
+    if args.algorithm not in registry.BY_NAME:
+        parser.error(f'unknown algorithm: {args.algorithm}')
+    if args.heuristic not in registry.HEURISTICS:
+        parser.error(f'unknown heuristic: {args.heuristic}')
+    if not validate_state(args.start) or (args.goal and not validate_state(args.goal, board_of(args.start).n)):
+        parser.error('start and goal must be permutations of 0..n*n-1 on the same n x n board')
+    options = {'limit': args.limit, 'weight': args.weight}
+    check_options(parser, args.algorithm, options)
+
+    goal = args.goal or board_of(args.start).goal
+    record = {'start': args.start, 'goal': goal}
+    out = solve_one(record, args.algorithm, args.heuristic, True, args.stats, args.cache, args.max_nodes, args.max_time,
+                    options)
+    del out['id']
+    if args.json:
+        print(json.dumps(out))
+    elif 'error' in out:
+        print(f"error: {out['error']}", file=sys.stderr)
+    else:
+        for i, move in enumerate(out.get('moves', ()), 1):
+            print(f'{i:3d}. {move}')
+        if out['solved']:
+            print(f"{out['move_count']} moves in {out['time']:.3f} s" + (f" ({out['winner']})" if 'winner' in out else ''))
+        elif 'budget_exceeded' in out:
+            print(f"no solution within the {out['budget_exceeded']} budget")
+        else:
+            print('no solution (start and goal are not reachable from each other)')
+        for key, value in out.get('stats', {}).items():
+            print(f'{key}: {value}')
+    return 1 if 'error' in out or not out['solved'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,17 @@
-from ui.app_window import PuzzleApp
-import tkinter as tk
+import sys
 
 def main():
+    # Tk is only imported for the GUI; `python main.py <start> ...` solves headless
+    import tkinter as tk
+    from ui.app_window import PuzzleApp
     root = tk.Tk()
     root.title("8-Puzzle Solver")
     app = PuzzleApp(root)
+    root.protocol('WM_DELETE_WINDOW', app.on_close)
     root.mainloop()
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        from cli.solve import main as solve
+        sys.exit(solve())
     main()
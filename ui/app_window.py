@@ -1,15 +1,24 @@
+import queue
 import tkinter as tk
 from tkinter import ttk, messagebox
 from .input_grid import InputGrid
 from .log_viewer import LogViewer
-from algorithms.uninformed_searches import bfs, dfs, dls, ids, bidirectional_search
-from algorithms.informed_searches import a_star, uniform_cost_search, greedy_best_first_search, heuristics_map
+from .solver_worker import worker_main
+from algorithms import registry
 from utils.puzzle_utils import state_from_entries, validate_state
+from utils.solution_cache import SolutionCache
+
+POLL_MS = 100
+# optimal algorithms; their results go through the solution cache
+OPTIMAL = tuple(a.label for a in registry.ALGORITHMS if a.label and a.optimal)
 
 class PuzzleApp(tk.Frame):
     def __init__(self, master):
         super().__init__(master)
         self.master = master
+        self.worker = None
+        self.cache = None
+        self.bound = None  # suboptimality bound of the last anytime solution
         self.grid(padx=12, pady=12)
         self.create_widgets()
 
@@ -33,42 +42,45 @@ class PuzzleApp(tk.Frame):
         alg_menu = ttk.Combobox(
             alg_frame, 
             textvariable=self.alg_var, 
-            values=[
-                'BFS',
-                'DFS',
-                'DLS',
-                'IDS',
-                'Bidirectional',
-                'A*',
-                'UCS',
-                'Greedy Best First Search'
-                ], 
+            values=registry.labels(), 
             state='readonly', 
             width=12
             )
         alg_menu.grid(row=0, column=1, padx=(6,12))
 
-        tk.Label(alg_frame, text='Depth Limit:').grid(row=0, column=2, sticky='w')
+        # depth limit for DLS, stored-node cap for memory-bounded A*
+        tk.Label(alg_frame, text='Limit:').grid(row=0, column=2, sticky='w')
         self.depth_entry = tk.Entry(alg_frame, width=5)
         self.depth_entry.grid(row=0, column=3, padx=(6,12))
 
         tk.Label(alg_frame, text='Heuristic:').grid(row=0, column=4, sticky='w')
         self.heur_var = tk.StringVar(value='manhattan')
-        self.heur_menu = ttk.Combobox(alg_frame, textvariable=self.heur_var, values=list(heuristics_map.keys()), state='readonly', width=12)
+        self.heur_menu = ttk.Combobox(alg_frame, textvariable=self.heur_var, values=list(registry.HEURISTICS), state='readonly', width=16)
         self.heur_menu.grid(row=0, column=5, padx=(6,12))
 
+        tk.Label(alg_frame, text='Weight:').grid(row=1, column=2, sticky='w', pady=(4,0))
+        self.weight_entry = tk.Entry(alg_frame, width=5)
+        self.weight_entry.grid(row=1, column=3, padx=(6,12), pady=(4,0))
+
+        tk.Label(alg_frame, text='Budget (s):').grid(row=1, column=4, sticky='w', pady=(4,0))
+        self.budget_entry = tk.Entry(alg_frame, width=5)
+        self.budget_entry.grid(row=1, column=5, padx=(6,12), pady=(4,0), sticky='w')
+
         # Solve / Reset / Close
         btn_frame = tk.Frame(self)
         btn_frame.grid(row=4, column=0, columnspan=2, pady=(8,0))
 
-        solve_btn = tk.Button(btn_frame, text='SOLVE', width=10, command=self.on_solve)
-        solve_btn.grid(row=0, column=0, padx=6)
+        self.solve_btn = tk.Button(btn_frame, text='SOLVE', width=10, command=self.on_solve)
+        self.solve_btn.grid(row=0, column=0, padx=6)
+
+        self.cancel_btn = tk.Button(btn_frame, text='CANCEL', width=10, command=self.on_cancel, state='disabled')
+        self.cancel_btn.grid(row=0, column=1, padx=6)
 
         reset_btn = tk.Button(btn_frame, text='RESET', width=10, command=self.on_reset)
-        reset_btn.grid(row=0, column=1, padx=6)
+        reset_btn.grid(row=0, column=2, padx=6)
 
-        close_btn = tk.Button(btn_frame, text='CLOSE', width=10, command=self.master.quit)
-        close_btn.grid(row=0, column=2, padx=6)
+        close_btn = tk.Button(btn_frame, text='CLOSE', width=10, command=self.on_close)
+        close_btn.grid(row=0, column=3, padx=6)
 
         # Status labels
         status_frame = tk.Frame(self)
@@ -86,11 +98,15 @@ class PuzzleApp(tk.Frame):
         self.steps_label = tk.Label(status_frame, text='Moves: -')
         self.steps_label.grid(row=0, column=3, sticky='w', padx=(0,12))
 
+        self.progress_label = tk.Label(status_frame, text='Nodes: - | Frontier: -')
+        self.progress_label.grid(row=1, column=0, columnspan=4, sticky='w')
+
         # Log viewer
         self.log = LogViewer(self, width=60, height=12)
         self.log.grid(row=6, column=0, columnspan=2, pady=(8,0))
 
     def on_reset(self):
+        self.on_cancel()
         self.start_grid.clear()
         self.goal_grid.clear()
         self.log.clear()
@@ -98,8 +114,21 @@ class PuzzleApp(tk.Frame):
         self.complete_label.config(text='Complete?: -')
         self.optimal_label.config(text='Optimal?: -')
         self.steps_label.config(text='Moves: -')
+        self.progress_label.config(text='Nodes: - | Frontier: -')
+
+    def on_close(self):
+        if self.worker is not None:
+            # let a portfolio stop its racers before the worker is killed
+            self.worker[2].set()
+            self.worker[0].join(timeout=0.5)
+            self.worker[0].terminate()
+        if self.cache is not None:
+            self.cache.close()
+        self.master.quit()
 
     def on_solve(self):
+        if self.worker is not None:
+            return
         try:
             start = state_from_entries(self.start_grid.get_values())
             goal = state_from_entries(self.goal_grid.get_values())
@@ -109,53 +138,162 @@ class PuzzleApp(tk.Frame):
 
         # Choose algorithm
         alg = self.alg_var.get()
-        self.log.clear()
-
-        import time
-        t0 = time.time()
-
-        if alg == 'BFS':
-            result = bfs(start, goal)
-        elif alg == 'DFS':
-            result = dfs(start, goal)
-        elif alg == 'DLS':
+        limit = None
+        if alg == 'DLS':
             try:
                 limit = int(self.depth_entry.get())
             except:
                 messagebox.showerror('Invalid input', 'Depth limit must be an integer for DLS.')
                 return
-            result = dls(start, goal, limit)
-        elif alg == 'IDS':
-            result = ids(start, goal)
-        elif alg == 'Bidirectional':
-            result = bidirectional_search(start, goal)
-        elif alg == 'A*':
-            hname = self.heur_var.get()
-            result = a_star(start, goal, heuristic=heuristics_map[hname])
-        elif alg == 'UCS':
-            result = uniform_cost_search(start, goal)
-        elif alg == 'Greedy Best First Search':
-            hname = self.heur_var.get()
-            result = greedy_best_first_search(start, goal, heuristic=heuristics_map[hname])
-        t1 = time.time()
+        elif alg == 'Memory-bounded A*' and self.depth_entry.get().strip():
+            try:
+                limit = int(self.depth_entry.get())
+                if limit < 1:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror('Invalid input', 'Limit must be a positive node count for memory-bounded A*.')
+                return
+        weight = budget = None
+        try:
+            if alg in ('Weighted A*', 'ARA*', 'Portfolio') and self.weight_entry.get().strip():
+                weight = float(self.weight_entry.get())
+                if not registry.valid_weight(alg, weight):
+                    raise ValueError
+        except ValueError:
+            messagebox.showerror('Invalid input', 'Weight must be a finite number of at least 1 (for Portfolio, the bound; inf for any solution).')
+            return
+        try:
+            if self.budget_entry.get().strip():
+                budget = float(self.budget_entry.get())
+                if budget <= 0:
+                    raise ValueError
+        except ValueError:
+            messagebox.showerror('Invalid input', 'Budget must be a positive number of seconds.')
+            return
+        self.log.clear()
+        self.bound = None
+
+        if alg in OPTIMAL:
+            if self.cache is None:
+                self.cache = SolutionCache()
+            result = self.cache.get(start, goal)
+            if result is not None:
+                self._show(result, 0.0, alg)
+                self.progress_label.config(text='Nodes: 0 | from solution cache')
+                return
+
+        # solve in a separate process; _poll() picks up its messages
+        import multiprocessing as mp  # deferred until the first solve to keep startup fast
+        ctx = mp.get_context('spawn')
+        results = ctx.Queue()
+        cancel_event = ctx.Event()
+        proc = ctx.Process(
+            target=worker_main,
+            args=(results, cancel_event, alg, start, goal, self.heur_var.get(), limit, weight, budget),
+            daemon=not registry.get(alg).processes  # daemon processes cannot start their own
+            )
+        proc.start()
+        self.worker = (proc, results, cancel_event, alg, start, goal)
+        self.solve_btn.config(state='disabled')
+        self.cancel_btn.config(state='normal')
+        self.complete_label.config(text='Complete?: solving...')
+        self.after(POLL_MS, self._poll)
+
+    def on_cancel(self):
+        if self.worker is not None:
+            self.worker[2].set()
+            self.cancel_btn.config(state='disabled')
+
+    def _poll(self):
+        if self.worker is None:
+            return
+        proc, results, cancel_event, alg, start, goal = self.worker
+        while True:
+            try:
+                msg = results.get_nowait()
+            except queue.Empty:
+                break
+            if msg[0] == 'progress':
+                _, expanded, frontier, elapsed = msg
+                self.progress_label.config(text=f'Nodes: {expanded:,} | Frontier: {frontier:,}')
+                self.time_label.config(text=f'Time taken: {elapsed:.1f}s')
+            elif msg[0] == 'solution':
+                _, n, self.bound, elapsed, source = msg
+                quality = ('optimal' if self.bound == 1 else 'no bound' if self.bound == float('inf')
+                           else f'within {self.bound:.3f}x of optimal')
+                self.log.append(f'{elapsed:.2f}s: {n} moves, {quality}' + (f' (won by {source})' if source else ''))
+                self.optimal_label.config(text=self._optimal_text())
+            else:
+                self._finish(msg, alg, start, goal)
+                return
+        if not proc.is_alive() and results.empty():
+            self._finish(('error', 'Solver process exited unexpectedly.'), alg, start, goal)
+            return
+        self.after(POLL_MS, self._poll)
+
+    def _finish(self, msg, alg, start, goal):
+        proc = self.worker[0]
+        self.worker = None
+        proc.join(timeout=1)
+        self.solve_btn.config(state='normal')
+        self.cancel_btn.config(state='disabled')
 
+        if msg[0] == 'cancelled':
+            self.log.append('Cancelled.')
+            self.complete_label.config(text='Complete?: CANCELLED')
+            self.time_label.config(text=f'Time taken: {msg[1]:.4f}s')
+            return
+        if msg[0] == 'error':
+            self.complete_label.config(text='Complete?: -')
+            messagebox.showerror('Solver error', msg[1])
+            return
+
+        if msg[0] == 'budget':
+            _, which, elapsed, stats = msg
+            result = None
+        else:
+            _, result, elapsed, stats = msg
+        self.progress_label.config(
+            text=f"Expanded: {stats['expanded']:,} | Generated: {stats['generated']:,} | "
+                 f"Duplicates: {stats['duplicates']:,} | Max frontier: {stats['max_frontier']:,} | "
+                 f"Closed: {stats['max_closed']:,}" + (f" | Re-expanded: {stats['reexpanded']:,}" if stats['reexpanded'] else '')
+            )
         if result is None:
-            self.log.append('No solution found.')
-            self.complete_label.config(text='Complete?: NO')
+            if msg[0] == 'budget':
+                self.log.append(f'Budget ({which}) ran out before a solution was found.')
+                self.complete_label.config(text='Complete?: BUDGET')
+            else:
+                self.log.append('No solution found.')
+                self.complete_label.config(text='Complete?: NO')
             self.optimal_label.config(text='Optimal?: -')
-            self.time_label.config(text=f'Time taken: {t1 - t0:.4f}s')
+            self.time_label.config(text=f'Time taken: {elapsed:.4f}s')
             self.steps_label.config(text='Moves: -')
             return
+        if alg in OPTIMAL or self.bound == 1:
+            if self.cache is None:
+                self.cache = SolutionCache()
+            self.cache.put(start, goal, result)
+        self._show(result, elapsed, alg)
 
+    def _show(self, result, elapsed, alg):
         path, moves = result  # path: list of states, moves: list of move descriptions
 
-        # Log results
-        for i, (state, mv) in enumerate(zip(path, ['Start'] + moves)):
-            self.log.append(f"{i}/{len(moves)} | {mv} | {state}")
+        # Log results; rows are formatted only when scrolled into view
+        n = len(moves)
+        self.log.set_rows(len(path), lambda i: f"{i}/{n} | {moves[i - 1] if i else 'Start'} | {path[i]}")
 
-        self.time_label.config(text=f'Time taken: {t1 - t0:.4f}s')
+        self.time_label.config(text=f'Time taken: {elapsed:.4f}s')
         self.complete_label.config(text='Complete?: YES')
 
-        self.optimal_label.config(text='Optimal?: YES' if alg in ('BFS','A*', 'Bidirectional', 'IDS', 'UCS') else 'Optimal?: NO')
+        if self.bound is not None:
+            self.optimal_label.config(text=self._optimal_text())
+        else:
+            self.optimal_label.config(text='Optimal?: YES' if alg in OPTIMAL else 'Optimal?: NO')
         self.steps_label.config(text=f'Moves: {len(moves)}')
 
+    def _optimal_text(self):
+        if self.bound == 1:
+            return 'Optimal?: YES'
+        if self.bound == float('inf'):
+            return 'Optimal?: NO'
+        return f'Optimal?: within {self.bound:.3f}x'
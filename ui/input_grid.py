@@ -1,12 +1,12 @@
 import tkinter as tk
 
 class InputGrid(tk.Frame):
-    def __init__(self, master, prefix='G'):
+    def __init__(self, master, prefix='G', size=3):
         super().__init__(master)
         self.entries = []
-        for r in range(3):
+        for r in range(size):
             row = []
-            for c in range(3):
+            for c in range(size):
                 e = tk.Entry(self, width=3, justify='center')
                 e.grid(row=r, column=c, padx=2, pady=2)
                 row.append(e)
@@ -17,7 +17,7 @@ class InputGrid(tk.Frame):
         return [[e.get().strip() for e in row] for row in self.entries]
 
     def set_values(self, state):
-        # state: tuple/list of 9 ints
+        # state: flat tuple/list of size*size ints
         flat = list(state)
         for i, e in enumerate([ent for row in self.entries for ent in row]):
             e.delete(0, 'end')
@@ -1,15 +1,85 @@
 import tkinter as tk
-from tkinter.scrolledtext import ScrolledText
+import tkinter.font as tkfont
 
 class LogViewer(tk.Frame):
+    # Virtual log: rows live in memory as a count plus a row(i) formatter, and
+    # only the `height` rows in view are formatted and drawn, so the cost of
+    # showing a solution does not grow with its length.
     def __init__(self, master, width=50, height=10):
         super().__init__(master)
-        self.text = ScrolledText(self, width=width, height=height, state='normal', wrap='none')
-        self.text.pack(fill='both', expand=True)
+        self.height = height
+        self.text = tk.Text(self, width=width, height=height, wrap='none')
+        self.scrollbar = tk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.text.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+        self.text.configure(state='disabled')
+        self.line_px = tkfont.Font(root=self, font=self.text.cget('font')).metrics('linespace')
+        for seq in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.text.bind(seq, self._on_wheel)
+        self.text.bind('<Configure>', lambda e: self._render())
+        self._lines = []   # plain lines from append()
+        self._row = None   # row formatter from set_rows(), None for plain lines
+        self._count = 0
+        self._first = 0
+
+    def set_rows(self, count, row):
+        # show `count` rows; row(i) returns the text of row i when it scrolls into view
+        self._lines = []
+        self._row = row
+        self._count = count
+        self._first = 0
+        self._render()
 
     def append(self, line):
-        self.text.insert('end', line + '\n')
-        self.text.see('end')
+        if self._row is not None:
+            # materialise the rows of a previous set_rows() before mixing in plain lines
+            self._lines = [self._row(i) for i in range(self._count)]
+            self._row = None
+        self._lines.append(line)
+        self._count = len(self._lines)
+        self._first = max(0, self._count - self._visible())
+        self._render()
 
     def clear(self):
+        self._lines = []
+        self._row = None
+        self._count = 0
+        self._first = 0
+        self._render()
+
+    def _visible(self):
+        # rows that fit in the widget right now (the configured height before it is mapped)
+        h = self.text.winfo_height()
+        return max(1, h // self.line_px) if h > 1 else self.height
+
+    def _scroll_to(self, first):
+        first = max(0, min(first, self._count - self._visible()))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def _render(self):
+        row = self._row or self._lines.__getitem__
+        last = min(self._count, self._first + self._visible())
+        self.text.configure(state='normal')
         self.text.delete('1.0', 'end')
+        self.text.insert('1.0', '\n'.join(row(i) for i in range(self._first, last)))
+        self.text.configure(state='disabled')
+        if self._count:
+            self.scrollbar.set(self._first / self._count, last / self._count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self._scroll_to(int(float(amount) * self._count))
+        elif action == 'scroll':
+            step = self._visible() if unit == 'pages' else 1
+            self._scroll_to(self._first + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self._scroll_to(self._first - 3)
+        else:
+            self._scroll_to(self._first + 3)
+        return 'break'
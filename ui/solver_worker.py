@@ -0,0 +1,43 @@
+# Runs one solve in a separate process so the Tk event loop never waits on
+# the GIL. Messages go back over a multiprocessing queue:
+#   ('progress', expanded, frontier, elapsed)
+#   ('done', result, elapsed, stats)   result is (path, moves) or None,
+#                                      stats a SearchStats.as_dict()
+#   ('solution', moves, bound, elapsed, source)  an anytime search improved its
+#                                      answer (source: the portfolio's winner, or None)
+#   ('budget', which, elapsed, stats)   the time budget ran out with no solution
+#   ('cancelled', elapsed) / ('error', message)
+# The parent sets `cancel_event`; searches notice it at their next tick.
+from algorithms import registry
+from utils.search_control import SearchControl, Cancelled, BudgetExceeded
+from utils.search_stats import SearchStats
+
+PROGRESS_INTERVAL = 0.2  # seconds between progress messages
+
+def run_algorithm(alg, start, goal, hname=None, limit=None, control=None, stats=None, weight=None, on_solution=None):
+    # `alg` is a UI label; the search module is only imported in this process
+    return registry.get(alg).run(start, goal, hname, control, stats, limit=limit, weight=weight, on_solution=on_solution)
+
+def worker_main(queue, cancel_event, alg, start, goal, hname=None, limit=None, weight=None, budget=None):
+    last = [0.0]
+
+    def on_progress(expanded, frontier, elapsed):
+        if elapsed - last[0] >= PROGRESS_INTERVAL:
+            last[0] = elapsed
+            queue.put(('progress', expanded, frontier, elapsed))
+
+    def on_solution(result, bound, source=None):
+        queue.put(('solution', len(result[1]), bound, control.elapsed(), source))
+
+    control = SearchControl(cancel_event, on_progress, max_time=budget)
+    stats = SearchStats()
+    try:
+        result = run_algorithm(alg, start, goal, hname, limit, control, stats, weight, on_solution)
+    except BudgetExceeded as e:
+        queue.put(('budget', str(e), control.elapsed(), stats.as_dict()))
+    except Cancelled:
+        queue.put(('cancelled', control.elapsed()))
+    except Exception as e:
+        queue.put(('error', f'{type(e).__name__}: {e}'))
+    else:
+        queue.put(('done', result, control.elapsed(), stats.as_dict()))
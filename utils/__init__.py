@@ -0,0 +1,19 @@
+import os
+import tempfile
+
+# built tables, caches and statistics files live in the project's data/ directory
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def write_atomic(path, data, mode='wb'):
+    # write through a temp file unique to this call, then rename it into place,
+    # so processes building the same file at once never see a partial one
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
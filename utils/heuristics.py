@@ -1,14 +1,325 @@
-# Separate heuristics module (optional)
-def misplaced(state, goal):
-    return sum(1 for a,b in zip(state, goal) if a!=0 and a!=b)
-
-def manhattan(state, goal):
-    def pos(idx): return (idx//3, idx%3)
-    goal_pos = {val:i for i,val in enumerate(goal)}
-    total = 0
-    for i,val in enumerate(state):
-        if val==0: continue
-        gi = goal_pos[val]
-        r1,c1 = pos(i); r2,c2 = pos(gi)
-        total += abs(r1-r2) + abs(c1-c2)
-    return total
+# Heuristic engine. Misplaced tiles and Manhattan distance are sums of a
+# per-tile cost, so each goal gets a tile x position table built once; a
+# search that slides a single tile updates h with one lookup in the per-blank
+# delta table. Linear conflict, walking distance, the pattern and distance
+# databases and max-combinations score packed states through evaluator(goal).
+# heuristics_map names every heuristic the searches, CLIs and UI offer.
+from collections import OrderedDict, deque
+from utils.distance_db import get_db
+from utils.pattern_db import PatternDBHeuristic, PARTITION_663
+from utils.puzzle_utils import board_of, unpack, pack
+
+class TileHeuristic:
+    # h(state) = sum of cost(pos, goal_pos, n) over the non-blank tiles
+    max_goals = 64  # goals whose tables are kept; the least recently used goes first
+
+    def __init__(self, cost):
+        self.cost = cost
+        self._tables = OrderedDict()
+        self._deltas = {}
+
+    def table(self, goal):
+        # table[tile][pos] -> cost of tile sitting at pos; row 0 (blank) is all zero
+        goal = tuple(goal)
+        table = self._tables.get(goal)
+        if table is not None:
+            self._tables.move_to_end(goal)
+        else:
+            if len(self._tables) >= self.max_goals:
+                old, _ = self._tables.popitem(last=False)
+                self._deltas.pop(old, None)
+            bd = board_of(goal)
+            goal_pos = {val: i for i, val in enumerate(goal)}
+            table = tuple(
+                tuple(self.cost(pos, goal_pos[tile], bd.n) if tile else 0 for pos in range(bd.cells))
+                for tile in range(bd.cells)
+            )
+            self._tables[goal] = table
+        return table
+
+    def deltas(self, goal):
+        # deltas[blank][move][tile] -> change in h when that move slides tile into blank
+        goal = tuple(goal)
+        table = self.table(goal)  # also marks the goal as recently used
+        deltas = self._deltas.get(goal)
+        if deltas is None:
+            deltas = self._deltas[goal] = _delta_table(board_of(goal), table)
+        return deltas
+
+    def evaluator(self, goal):
+        # h(code) from scratch, for combinators; searches use deltas()
+        table = self.table(goal)
+        bd = board_of(goal)
+        cells = [(bd.bits * i, [row[i] for row in table]) for i in range(bd.cells)]
+        mask = bd.mask
+
+        def evaluate(code):
+            return sum(costs[(code >> shift) & mask] for shift, costs in cells)
+        return evaluate
+
+    def __call__(self, state, goal):
+        table = self.table(goal)
+        return sum(table[val][i] for i, val in enumerate(state))
+
+def _delta_table(bd, table):
+    deltas = []
+    for b, moves in enumerate(bd.moves):
+        row = [None] * 4
+        for d, shift, mul, bx in moves:
+            nb = shift // bd.bits
+            row[d] = tuple(table[t][b] - table[t][nb] for t in range(bd.cells))
+        deltas.append(tuple(row))
+    return tuple(deltas)
+
+def _misplaced_cost(pos, goal_pos, n):
+    return 0 if pos == goal_pos else 1
+
+def _manhattan_cost(pos, goal_pos, n):
+    r1, c1 = divmod(pos, n); r2, c2 = divmod(goal_pos, n)
+    return abs(r1 - r2) + abs(c1 - c2)
+
+misplaced = TileHeuristic(_misplaced_cost)
+manhattan = TileHeuristic(_manhattan_cost)
+
+class LinearConflict:
+    # Manhattan distance plus 2 per tile that has to leave its goal line so
+    # the others in that line can pass: in each row, the tiles whose goal is
+    # that row, minus the longest run of them already in goal-column order
+    # (and the same for columns). Line costs are memoized by line contents.
+    max_goals = 64  # goals whose evaluators are kept; the least recently used goes first
+    max_memo = 1 << 19  # memo entries over all lines of a goal (every 4x4 line fits)
+
+    def __init__(self):
+        self._evaluators = OrderedDict()
+
+    def evaluator(self, goal):
+        goal = tuple(goal)
+        evaluate = self._evaluators.get(goal)
+        if evaluate is not None:
+            self._evaluators.move_to_end(goal)
+        else:
+            if len(self._evaluators) >= self.max_goals:
+                self._evaluators.popitem(last=False)
+            evaluate = self._evaluators[goal] = self._make_evaluator(goal)
+        return evaluate
+
+    def _make_evaluator(self, goal):
+        bd = board_of(goal)
+        n, bits, mask = bd.n, bd.bits, bd.mask
+        table = manhattan.table(goal)
+        goal_at = {t: divmod(i, n) for i, t in enumerate(goal) if t}
+        # a line's key packs its tiles like a row of the state, so a row's key is
+        # a slice of the code and a column's is gathered while summing Manhattan
+        line_mask = (1 << bits * n) - 1
+        cells = [(bits * i, [row[i] for row in table], i % n, bits * (i // n)) for i in range(bd.cells)]
+        # target[tile]: goal column (rows) or goal row (columns) of a tile that
+        # belongs to this line, None otherwise
+        rows, cols = [], []
+        for k in range(n):
+            rows.append((bits * n * k, {}, [None] + [goal_at[t][1] if goal_at[t][0] == k else None for t in range(1, bd.cells)]))
+            cols.append(({}, [None] + [goal_at[t][0] if goal_at[t][1] == k else None for t in range(1, bd.cells)]))
+        # the memos share one budget: every line gets an equal slice of it
+        limit = self.max_memo // (2 * n)
+
+        def conflicts(key, memo, target):
+            if len(memo) >= limit:
+                memo.clear()
+            order = [target[(key >> bits * j) & mask] for j in range(n)]
+            cost = memo[key] = _line_conflicts([x for x in order if x is not None])
+            return cost
+
+        def evaluate(code):
+            h = 0
+            keys = [0] * n
+            for shift, costs, c, line_shift in cells:
+                t = (code >> shift) & mask
+                h += costs[t]
+                keys[c] |= t << line_shift
+            for shift, memo, target in rows:
+                key = (code >> shift) & line_mask
+                cost = memo.get(key)
+                h += conflicts(key, memo, target) if cost is None else cost
+            for key, (memo, target) in zip(keys, cols):
+                cost = memo.get(key)
+                h += conflicts(key, memo, target) if cost is None else cost
+            return h
+        return evaluate
+
+    def __call__(self, state, goal):
+        return self.evaluator(goal)(pack(state))
+
+def _line_conflicts(order):
+    # 2 * (tiles not in the longest increasing run of goal indices)
+    if len(order) < 2:
+        return 0
+    best = [1] * len(order)
+    for i in range(1, len(order)):
+        for j in range(i):
+            if order[j] < order[i] and best[j] + 1 > best[i]:
+                best[i] = best[j] + 1
+    return 2 * (len(order) - max(best))
+
+class WalkingDistance:
+    # Walking distance (Takahashi): ignore columns and count the moves needed
+    # to bring every tile into its goal row, where a move swaps the blank with
+    # any tile of an adjacent row; likewise for columns, and add the two. A
+    # configuration is how many tiles of each goal line sit in each line, plus
+    # the blank's line, packed 3 bits per count. Its distance comes from a BFS
+    # table shared by every goal with the blank on the same line; tables are
+    # built on first use, for boards up to 4x4 (24,964 configurations).
+    max_n = 4
+    max_goals = 64
+
+    def __init__(self):
+        self._tables = {}  # (n, blank line) -> {config: distance}
+        self._evaluators = OrderedDict()
+
+    def table(self, n, blank_line):
+        key = (n, blank_line)
+        if key not in self._tables:
+            self._tables[key] = _walking_table(n, blank_line)
+        return self._tables[key]
+
+    def evaluator(self, goal):
+        goal = tuple(goal)
+        evaluate = self._evaluators.get(goal)
+        if evaluate is not None:
+            self._evaluators.move_to_end(goal)
+        else:
+            if len(self._evaluators) >= self.max_goals:
+                self._evaluators.popitem(last=False)
+            evaluate = self._evaluators[goal] = self._make_evaluator(goal)
+        return evaluate
+
+    def _make_evaluator(self, goal):
+        bd = board_of(goal)
+        n = bd.n
+        if n > self.max_n:
+            raise ValueError(f'walking distance supports boards up to {self.max_n}x{self.max_n}')
+        br, bc = divmod(goal.index(0), n)
+        rows, cols = self.table(n, br), self.table(n, bc)
+        goal_at = {t: divmod(i, n) for i, t in enumerate(goal)}
+        blank = 3 * n * n
+        # (shift, row_part[tile], col_part[tile]) per cell: each tile adds one
+        # to the count of (its line, its goal line); the blank records its line
+        cells = []
+        for i in range(bd.cells):
+            r, c = divmod(i, n)
+            row_part = [r << blank] + [1 << 3 * (r * n + goal_at[t][0]) for t in range(1, bd.cells)]
+            col_part = [c << blank] + [1 << 3 * (c * n + goal_at[t][1]) for t in range(1, bd.cells)]
+            cells.append((bd.bits * i, row_part, col_part))
+        mask = bd.mask
+
+        def evaluate(code):
+            kr = kc = 0
+            for shift, row_part, col_part in cells:
+                t = (code >> shift) & mask
+                kr += row_part[t]
+                kc += col_part[t]
+            return rows[kr] + cols[kc]
+        return evaluate
+
+    def __call__(self, state, goal):
+        return self.evaluator(goal)(pack(state))
+
+def _walking_table(n, blank_line):
+    # BFS over line configurations from the goal one
+    blank = 3 * n * n
+    goal = sum((n - (r == blank_line)) << 3 * (r * n + r) for r in range(n)) | blank_line << blank
+    dist = {goal: 0}
+    layer = deque([goal])
+    while layer:
+        config = layer.popleft()
+        line = config >> blank
+        d = dist[config] + 1
+        for other in (line - 1, line + 1):
+            if not 0 <= other < n:
+                continue
+            for j in range(n):
+                if (config >> 3 * (other * n + j)) & 7:
+                    # a tile of goal line j walks from `other` into the blank's line
+                    child = config - (1 << 3 * (other * n + j)) + (1 << 3 * (line * n + j))
+                    child += (other - line) << blank
+                    if child not in dist:
+                        dist[child] = d
+                        layer.append(child)
+    return dist
+
+class MaxHeuristic:
+    # max over admissible heuristics, which is admissible; it is consistent only
+    # if every one of them is, so not with pdb or pdb663 among them. Scores
+    # packed states with each one's evaluator
+    def __init__(self, *heuristics):
+        self.heuristics = heuristics
+
+    def evaluator(self, goal):
+        evaluators = [evaluator_of(h, goal) for h in self.heuristics]
+
+        def evaluate(code):
+            best = 0
+            for e in evaluators:
+                h = e(code)
+                if h > best:
+                    best = h
+            return best
+        return evaluate
+
+    def __call__(self, state, goal):
+        return self.evaluator(goal)(pack(state))
+
+def evaluator_of(heuristic, goal):
+    # h(code) for any heuristics_map entry or plain h(state, goal) callable
+    evaluator = getattr(heuristic, 'evaluator', None)
+    if evaluator is not None:
+        return evaluator(goal)
+    bd = board_of(goal)
+    return lambda code: heuristic(unpack(code, bd), goal)
+
+def exact(state, goal):
+    # true distance from the perfect distance database (0 if unreachable)
+    return get_db().distance(state, goal) or 0
+
+linear_conflict = LinearConflict()
+walking_distance = WalkingDistance()
+pdb = PatternDBHeuristic()
+
+# by name, for the searches' callers; pdb and exact load their tables on first use
+heuristics_map = {
+    'misplaced': misplaced,
+    'manhattan': manhattan,
+    'linear_conflict': linear_conflict,
+    'walking_distance': walking_distance,
+    'max_lc_wd': MaxHeuristic(linear_conflict, walking_distance),
+    'pdb': pdb,
+    'pdb663': PatternDBHeuristic(PARTITION_663),  # 4x4 only
+    'exact': exact,
+}
+
+def build_tables(heuristic, goal):
+    # build the on-disk tables behind `heuristic` for `goal` in this process, so
+    # that worker processes started later only mmap the finished files; the
+    # other heuristics are cheap to set up in each worker
+    if isinstance(heuristic, PatternDBHeuristic):
+        heuristic.database(goal).tables()
+
+def name_of(heuristic):
+    # heuristics_map key of `heuristic` (how other processes look it up), or None
+    return next((k for k, v in heuristics_map.items() if v is heuristic), None)
+
+_zero_deltas = {}
+
+def prepare(heuristic, goal):
+    # (deltas, evaluate) for a search. deltas[blank][move][tile] is returned
+    # when h updates in O(1) (all zeros for heuristic=None); otherwise
+    # evaluate(code) scores a packed child from scratch. Heuristics may offer
+    # evaluator(goal) to read packed codes directly; plain h(state, goal)
+    # callables get each child unpacked.
+    bd = board_of(goal)
+    if heuristic is None:
+        if bd.n not in _zero_deltas:
+            _zero_deltas[bd.n] = _delta_table(bd, ((0,) * bd.cells,) * bd.cells)
+        return _zero_deltas[bd.n], None
+    deltas = getattr(heuristic, 'deltas', None)
+    if deltas is not None:
+        return deltas(goal), None
+    return None, evaluator_of(heuristic, goal)
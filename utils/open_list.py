@@ -0,0 +1,64 @@
+# Open lists for the best-first searches. Both hold (f, g, code, h) entries
+# and pop the lowest f, preferring the highest g among equal f (the deepest
+# node, closest to the goal). Superseded entries are not removed on decrease-
+# key; the search skips them when they come out (lazy deletion).
+import heapq
+
+class BucketQueue:
+    # O(1) push/pop for small non-negative integer f and g (unit move costs):
+    # buckets[f][g] is a LIFO stack of (code, h).
+    def __init__(self):
+        self.buckets = []
+        self.f = 0      # no entry has a smaller f
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, f, g, code, h):
+        buckets = self.buckets
+        while len(buckets) <= f:
+            buckets.append([])
+        row = buckets[f]
+        while len(row) <= g:
+            row.append([])
+        row[g].append((code, h))
+        self.size += 1
+        if f < self.f:
+            self.f = f
+
+    def pop(self):
+        buckets, f = self.buckets, self.f
+        while True:
+            row = buckets[f]
+            while row and not row[-1]:
+                row.pop()   # drop emptied high-g stacks so row[-1] is the best g
+            if row:
+                break
+            f += 1
+        self.f = f
+        g = len(row) - 1
+        code, h = row[g].pop()
+        self.size -= 1
+        return f, g, code, h
+
+class HeapQueue:
+    # binary heap fallback for f values that are not small integers
+    def __init__(self):
+        self.heap = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, f, g, code, h):
+        heapq.heappush(self.heap, (f, -g, code, h))
+
+    def pop(self):
+        f, g, code, h = heapq.heappop(self.heap)
+        return f, -g, code, h
+
+def open_list(weight, h0):
+    # bucket queue when every f = g + weight * h is a non-negative integer
+    if isinstance(h0, int) and float(weight).is_integer() and weight >= 0:
+        return BucketQueue()
+    return HeapQueue()
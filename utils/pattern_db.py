@@ -0,0 +1,177 @@
+# Additive disjoint pattern databases for n x n boards. The non-blank goal
+# cells are split into disjoint groups; for each group a 0-1 BFS from the goal
+# over (positions of the group's tiles, blank) counts only moves of group
+# tiles, and the fewest moves over all blank positions is stored for each
+# placement. Every move shifts one tile, which belongs to one group, so the
+# per-group lookups can be summed and stay admissible.
+#
+# A table is indexed by the group's tile positions, `bits` bits per tile,
+# one byte per entry, written to data/ and mmapped on first use.
+import mmap
+import os
+from collections import OrderedDict
+from utils import DATA_DIR, write_atomic
+from utils.puzzle_utils import board_of, pack
+
+UNSET = 0xFF
+
+# Groups are indices into the goal's non-blank cells in reading order, so
+# for the standard goal (blank last) they are plain cell numbers.
+PARTITIONS = {
+    3: ((0, 1, 3, 4), (2, 5, 6, 7)),
+    4: ((0, 1, 4, 5, 8), (2, 3, 6, 7, 11), (9, 10, 12, 13, 14)),  # 5-5-5
+    5: ((0, 1, 5, 6), (2, 3, 7, 8), (4, 9, 14, 19), (10, 11, 15, 20), (12, 13, 16, 17), (18, 21, 22, 23)),
+}
+# 4x4 only: tighter than 5-5-5, but each 6-tile table takes 16 MB and far
+# longer to build (heuristics_map['pdb663'])
+PARTITION_663 = ((0, 4, 5, 8, 9, 12), (6, 7, 10, 11, 13, 14), (1, 2, 3))
+
+def build_table(goal, cells):
+    # 0-1 BFS for the group occupying goal positions `cells`. The abstract
+    # state is a packed board whose group tiles carry their slot + 1 and whose
+    # other tiles are 0, with the group index kept above the blank field, so
+    # the board's move table drives the search: sliding a 0 tile is free,
+    # sliding a group tile costs one move.
+    bd = board_of(goal)
+    bits, mask, bs, moves = bd.bits, bd.mask, bd.blank_shift, bd.moves
+    k = len(cells)
+    top = bs + bits
+    blank = goal.index(0)
+    start = blank << bs
+    index = 0
+    for slot, cell in enumerate(cells):
+        start |= (slot + 1) << (bits * cell)
+        index |= cell << (bits * slot)
+    start |= index << top
+
+    table = bytearray([UNSET]) * (1 << (bits * k))
+    seen = bytearray(1 << (bits * (k + 1) - 3))
+    layer, cost = [start], 0
+    while layer:
+        stack = []
+        for s in layer:
+            key = (s >> top) << bits | (s >> bs) & mask
+            if not seen[key >> 3] & (1 << (key & 7)):
+                seen[key >> 3] |= 1 << (key & 7)
+                stack.append(s)
+        nxt = []
+        while stack:
+            s = stack.pop()
+            index = s >> top
+            if table[index] == UNSET:
+                table[index] = cost
+            b = (s >> bs) & mask
+            for d, shift, mul, bx in moves[b]:
+                t = (s >> shift) & mask
+                if t:
+                    # group tile t moves from shift // bits into b
+                    nxt.append((s ^ t * mul ^ bx) + ((b - shift // bits) << (bits * (t - 1) + top)))
+                else:
+                    child = s ^ bx
+                    key = index << bits | (shift // bits)
+                    if not seen[key >> 3] & (1 << (key & 7)):
+                        seen[key >> 3] |= 1 << (key & 7)
+                        stack.append(child)
+        layer, cost = nxt, cost + 1
+    return table
+
+def table_path(goal, cells, data_dir=DATA_DIR):
+    import hashlib  # deferred: only needed once a table is opened
+    n = board_of(goal).n
+    key = f'{n}:{goal.index(0)}:' + ','.join(map(str, cells))
+    return os.path.join(data_dir, f'pdb_{n}x{n}_{len(cells)}_{hashlib.sha1(key.encode()).hexdigest()[:12]}.bin')
+
+class PatternDatabase:
+    # additive PDB heuristic for one goal; tables are built or mmapped lazily
+    def __init__(self, goal, groups=None, data_dir=DATA_DIR):
+        self.goal = tuple(goal)
+        self.board = board_of(self.goal)
+        groups = groups or PARTITIONS[self.board.n]
+        if sorted(i for group in groups for i in group) != list(range(self.board.cells - 1)):
+            raise ValueError(f'the pattern groups do not partition the tiles of a {self.board.n}x{self.board.n} board')
+        open_cells = [i for i, v in enumerate(self.goal) if v]
+        self.cells = [tuple(open_cells[j] for j in group) for group in groups]
+        self.data_dir = data_dir
+        self._tables = None
+        self._evaluate = None
+        # place[tile] -> (group, shift of its position within the group index)
+        self.place = [None] * self.board.cells
+        for g, cells in enumerate(self.cells):
+            for slot, cell in enumerate(cells):
+                self.place[self.goal[cell]] = (g, self.board.bits * slot)
+
+    def tables(self):
+        if self._tables is None:
+            tables = []
+            for cells in self.cells:
+                path = table_path(self.goal, cells, self.data_dir)
+                if not os.path.exists(path):
+                    write_atomic(path, build_table(self.goal, cells))
+                with open(path, 'rb') as f:
+                    tables.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self._tables = tables
+        return self._tables
+
+    def evaluator(self):
+        # h(code) on packed states of this board
+        if self._evaluate is None:
+            self._evaluate = self._make_evaluator()
+        return self._evaluate
+
+    def _make_evaluator(self):
+        tables = self.tables()
+        bd = self.board
+        bits, mask, groups = bd.bits, bd.mask, len(tables)
+        # shifted[i][tile] -> (group, position i placed in that group's index)
+        shifted = [[None] + [(self.place[t][0], i << self.place[t][1]) if self.place[t] else None
+                             for t in range(1, bd.cells)] for i in range(bd.cells)]
+        cell_shifts = [(bits * i, shifted[i]) for i in range(bd.cells)]
+
+        def evaluate(code):
+            index = [0] * groups
+            for shift, row in cell_shifts:
+                entry = row[(code >> shift) & mask]
+                if entry is not None:
+                    index[entry[0]] |= entry[1]
+            return sum(table[i] for table, i in zip(tables, index))
+        return evaluate
+
+    def __call__(self, state):
+        return self.evaluator()(pack(state))
+
+class PatternDBHeuristic:
+    # heuristics_map entry: one PatternDatabase per goal, default partition per board size
+    max_goals = 8  # goals whose databases are kept; the least recently used goes first
+
+    def __init__(self, groups=None, data_dir=DATA_DIR):
+        self.groups = groups
+        self.data_dir = data_dir
+        self._dbs = OrderedDict()
+
+    def database(self, goal):
+        goal = tuple(goal)
+        db = self._dbs.get(goal)
+        if db is not None:
+            self._dbs.move_to_end(goal)
+        else:
+            if len(self._dbs) >= self.max_goals:
+                self._dbs.popitem(last=False)
+            db = self._dbs[goal] = PatternDatabase(goal, self.groups, self.data_dir)
+        return db
+
+    def evaluator(self, goal):
+        return self.database(goal).evaluator()
+
+    def __call__(self, state, goal):
+        return self.evaluator(goal)(pack(state))
+
+if __name__ == '__main__':
+    # python -m utils.pattern_db 4        -> build the default tables for the 15-puzzle
+    # python -m utils.pattern_db 4 663    -> the 6-6-3 tables instead
+    import sys
+    from utils.puzzle_utils import board
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    db = PatternDatabase(board(n).goal, PARTITION_663 if sys.argv[2:] == ['663'] else None)
+    db.tables()
+    for cells in db.cells:
+        print(table_path(db.goal, cells))
@@ -1,54 +1,163 @@
-# Helpers for 8-puzzle states
-from typing import List, Tuple
+# Helpers for sliding-puzzle states on n x n boards (the 8-puzzle by default)
+from functools import lru_cache
+from math import isqrt
 
-def state_from_entries(values: List[List[str]]):
-    # values: 3x3 list of strings from input entries
+def state_from_entries(values: list[list[str]]):
+    # values: n x n list of strings from input entries
+    size = len(values)
+    cells = size * size
     flat = []
     for row in values:
         for v in row:
             if v == '':
-                raise ValueError('All tiles must be filled with numbers 0-8.')
+                raise ValueError(f'All tiles must be filled with numbers 0-{cells - 1}.')
             try:
                 n = int(v)
             except:
-                raise ValueError('Tiles must be integers from 0 to 8.')
+                raise ValueError(f'Tiles must be integers from 0 to {cells - 1}.')
             flat.append(n)
-    if len(flat) != 9:
-        raise ValueError('Expected 9 values.')
-    if sorted(flat) != list(range(9)):
-        raise ValueError('Tiles must be numbers 0 through 8 with no repetition.')
+    if len(flat) != cells:
+        raise ValueError(f'Expected {cells} values.')
+    if sorted(flat) != list(range(cells)):
+        raise ValueError(f'Tiles must be numbers 0 through {cells - 1} with no repetition.')
     return tuple(flat)
 
-def validate_state(state):
-    return isinstance(state, tuple) and len(state) == 9 and sorted(state) == list(range(9))
+def validate_state(state, size=None):
+    # any n x n permutation of 0..n*n-1 (n >= 2), or exactly size x size when given
+    if not isinstance(state, tuple):
+        return False
+    n = isqrt(len(state))
+    if n < 2 or n * n != len(state) or (size is not None and n != size):
+        return False
+    return sorted(state) == list(range(n * n))
+
+def is_solvable(start, goal):
+    # Inversion parity decides reachability. On even-width boards each vertical
+    # blank move also flips the parity, so the blank rows are counted as well.
+    def inversions(state):
+        tiles = [v for v in state if v]
+        return sum(1 for i in range(len(tiles)) for j in range(i + 1, len(tiles)) if tiles[i] > tiles[j])
+    parity = inversions(start) + inversions(goal)
+    n = isqrt(len(start))
+    if n % 2 == 0:
+        parity += start.index(0) // n + goal.index(0) // n
+    return parity % 2 == 0
 
 def is_goal(state, goal):
     return state == goal
 
 def neighbors(state):
-    # yields (new_state, move_description)
-    s = list(state)
-    i = s.index(0)
-    r, c = divmod(i, 3)
-    moves = []
-    def swap_and_make(newi, action):
-        ns = s.copy()
-        ns[i], ns[newi] = ns[newi], ns[i]
-        return (tuple(ns), action)
-
-    if r > 0:  # up
-        newi = (r-1)*3 + c
-        moves.append(swap_and_make(newi, f'Move {s[newi]} down'))
-    if r < 2:  # down
-        newi = (r+1)*3 + c
-        moves.append(swap_and_make(newi, f'Move {s[newi]} up'))
-    if c > 0:  # left
-        newi = r*3 + (c-1)
-        moves.append(swap_and_make(newi, f'Move {s[newi]} right'))
-    if c < 2:  # right
-        newi = r*3 + (c+1)
-        moves.append(swap_and_make(newi, f'Move {s[newi]} left'))
-
-    return moves
+    # yields (new_state, move_description); searches use Board.moves instead
+    i = state.index(0)
+    for d, ni in board_of(state).legal[i]:
+        ns = list(state)
+        ns[i], ns[ni] = ns[ni], 0
+        yield tuple(ns), f'Move {state[ni]} {TILE_DIRECTION[d]}'
+
+
+# Packed states: the tile at index i lives in bits bits*i .. bits*i+bits-1 of
+# a plain int (4 bits per tile up to the 15-puzzle, 5 for the 24-puzzle) and
+# the blank index is carried above the tiles, from blank_shift up, so a node
+# knows its own blank and expansion never scans for the 0 tile.
+# Visited nodes keep only the 2-bit code of the blank move that reached them;
+# the parent is recovered by undoing that move, so paths are rebuilt at the end.
+UP, DOWN, LEFT, RIGHT = range(4)
+TILE_DIRECTION = ('down', 'up', 'right', 'left')  # tile moves opposite to the blank
+
+class Board:
+    # geometry and packed layout of an n x n board
+
+    def __init__(self, n):
+        self.n = n
+        self.cells = n * n
+        self.bits = max(4, (self.cells - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.blank_shift = self.bits * self.cells
+        self.delta = (-n, n, -1, 1)
+        self.goal = tuple(range(1, self.cells)) + (0,)
+        # legal[blank] -> ((move, new_blank), ...)
+        self.legal = tuple(self._legal_moves(i) for i in range(self.cells))
+        # moves[blank] -> ((move, shift, mul, blank_xor), ...). With
+        # t = (code >> shift) & mask the child is code ^ t * mul ^ blank_xor:
+        # the tile jumps into the old blank and the stored blank index is
+        # updated, with no list copies or string work.
+        self.moves = tuple(
+            tuple((d, self.bits * ni, (1 << (self.bits * ni)) | (1 << (self.bits * i)), (i ^ ni) << self.blank_shift)
+                  for d, ni in self.legal[i])
+            for i in range(self.cells)
+        )
+
+    def _legal_moves(self, i):
+        r, c = divmod(i, self.n)
+        last = self.n - 1
+        return tuple((d, i + self.delta[d]) for d, ok in ((UP, r > 0), (DOWN, r < last), (LEFT, c > 0), (RIGHT, c < last)) if ok)
+
+@lru_cache(maxsize=None)
+def board(n=3):
+    return Board(n)
+
+def board_of(state):
+    # the Board matching a flat state's length
+    return board(isqrt(len(state)))
+
+BOARD = board(3)
+DELTA = BOARD.delta
+BLANK_SHIFT = BOARD.blank_shift
+MOVES = BOARD.moves
+
+def pack(state):
+    bd = board_of(state)
+    code = state.index(0) << bd.blank_shift
+    for i, v in enumerate(state):
+        code |= v << (bd.bits * i)
+    return code
+
+def unpack(code, bd=BOARD):
+    return tuple((code >> (bd.bits * i)) & bd.mask for i in range(bd.cells))
+
+def blank_of(code, bd=BOARD):
+    return code >> bd.blank_shift
+
+def packed_neighbors(code, bd=BOARD):
+    # yields (child_code, blank_move); hot loops inline this over bd.moves
+    mask = bd.mask
+    for d, shift, mul, bx in bd.moves[code >> bd.blank_shift]:
+        yield code ^ ((code >> shift) & mask) * mul ^ bx, d
+
+def apply_move(code, d, bd=BOARD):
+    # packed state after blank move d (which must be legal)
+    for md, shift, mul, bx in bd.moves[code >> bd.blank_shift]:
+        if md == d:
+            return code ^ ((code >> shift) & bd.mask) * mul ^ bx
+    raise ValueError(f'illegal move {d} for blank at {code >> bd.blank_shift}')
+
+def describe_move(code, d, bd=BOARD):
+    # description of blank move d applied to packed state code
+    tile = (code >> (bd.bits * (blank_of(code, bd) + bd.delta[d]))) & bd.mask
+    return f'Move {tile} {TILE_DIRECTION[d]}'
+
+def trace(nodes, start, end, bd=BOARD):
+    # walk back from end to start undoing the move stored in each record's low 2 bits
+    codes, dirs = [end], []
+    code = end
+    while code != start:
+        d = nodes[code] & 3
+        code = apply_move(code, d ^ 1, bd)
+        codes.append(code)
+        dirs.append(d)
+    codes.reverse(); dirs.reverse()
+    return codes, dirs
 
+def to_result(codes, dirs, bd=BOARD):
+    # (path, moves) in the tuple/description form the UI expects; descriptions
+    # are only formatted here, for states on the returned path
+    return [unpack(c, bd) for c in codes], [describe_move(c, d, bd) for c, d in zip(codes, dirs)]
 
+def rank(state):
+    # Lehmer-code rank of a permutation: a dense index in [0, n!)
+    n = len(state)
+    r = 0
+    for i in range(n):
+        v = state[i]
+        r = r * (n - i) + sum(1 for x in state[i + 1:] if x < v)
+    return r
@@ -0,0 +1,54 @@
+# Cooperative control of a running search. Searches take an optional
+# `control` and call control.tick() every CHECK_EVERY expansions; tick raises
+# Cancelled once cancel() has been called (from any thread, or from another
+# process when built on a multiprocessing Event) and reports progress.
+# Optional node and time budgets raise BudgetExceeded the same way.
+import threading
+import time
+
+CHECK_EVERY = 1024  # expansions between ticks; searches test `not n & CHECK_MASK`
+CHECK_MASK = CHECK_EVERY - 1
+
+class Cancelled(Exception):
+    pass
+
+class BudgetExceeded(Cancelled):
+    # str(e) names the budget that ran out: 'nodes' or 'time'
+    pass
+
+class SearchControl:
+    def __init__(self, cancel_event=None, on_progress=None, max_nodes=None, max_time=None):
+        # on_progress(expanded, frontier, elapsed) is called from the search's thread;
+        # budgets are checked at each tick, so they overrun by up to CHECK_EVERY nodes
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
+        self.on_progress = on_progress
+        self.max_nodes = max_nodes
+        self.max_time = max_time
+        self.expanded = 0
+        self.started = time.perf_counter()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def tick(self, frontier):
+        self.report(self.expanded + CHECK_EVERY, frontier)
+
+    def report(self, expanded, frontier):
+        # tick() for searches that count expansions themselves (e.g. across processes)
+        self.expanded = expanded
+        if self.cancel_event.is_set():
+            raise Cancelled()
+        elapsed = self.elapsed()
+        if self.max_nodes is not None and expanded >= self.max_nodes:
+            raise BudgetExceeded('nodes')
+        if self.max_time is not None and elapsed >= self.max_time:
+            raise BudgetExceeded('time')
+        if self.on_progress is not None:
+            self.on_progress(self.expanded, frontier, elapsed)
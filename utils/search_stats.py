@@ -0,0 +1,67 @@
+# Optional statistics for one search run. Searches take `stats=None`; when a
+# SearchStats is passed they fill it in from local counters as they finish
+# (or are cancelled), so a search without one pays for no bookkeeping beyond
+# a per-expansion counter.
+import time
+
+class SearchStats:
+    def __init__(self, observer=None):
+        # observer(event, stats) is called with 'phase' on every phase change
+        # and with 'done' once the search has finished
+        self.observer = observer
+        self.expanded = 0       # nodes taken off the frontier and expanded
+        self.generated = 0      # children produced by those expansions
+        self.duplicates = 0     # children dropped because they were already known
+        self.stale_pops = 0     # frontier entries popped after being superseded
+        self.max_frontier = 0   # largest open list / stack / path depth
+        self.max_closed = 0     # largest visited/closed store
+        self.reexpanded = 0     # expansions repeated because stored nodes were dropped
+        self.phases = {}        # seconds spent per phase: setup, search, reconstruct
+        self._phase = None
+        self._since = None
+
+    def phase(self, name):
+        # close the running phase and start `name` (None just closes it)
+        now = time.perf_counter()
+        if self._phase is not None:
+            self.phases[self._phase] = self.phases.get(self._phase, 0.0) + now - self._since
+        self._phase, self._since = name, now
+        if self.observer is not None and name is not None:
+            self.observer('phase', self)
+
+    def add(self, expanded=0, generated=0, duplicates=0, stale_pops=0, frontier=0, closed=0, reexpanded=0):
+        self.expanded += expanded
+        self.reexpanded += reexpanded
+        self.generated += generated
+        self.duplicates += duplicates
+        self.stale_pops += stale_pops
+        self.max_frontier = max(self.max_frontier, frontier)
+        self.max_closed = max(self.max_closed, closed)
+
+    def done(self):
+        self.phase(None)
+        if self.observer is not None:
+            self.observer('done', self)
+
+    @property
+    def elapsed(self):
+        return sum(self.phases.values())
+
+    def as_dict(self):
+        return {
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'stale_pops': self.stale_pops,
+            'max_frontier': self.max_frontier,
+            'max_closed': self.max_closed,
+            'reexpanded': self.reexpanded,
+            'phases': {k: round(v, 6) for k, v in self.phases.items()},
+        }
+
+    def summary(self):
+        text = (f'Expanded: {self.expanded:,} | Generated: {self.generated:,} | '
+                f'Max frontier: {self.max_frontier:,} | Closed: {self.max_closed:,}')
+        if self.reexpanded:
+            text += f' | Re-expanded: {self.reexpanded:,}'
+        return text
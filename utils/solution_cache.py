@@ -0,0 +1,115 @@
+# Persistent cache of optimal solutions. A (start, goal) pair is relabelled
+# into the canonical frame of its goal's blank position (tiles renamed so the
+# goal reads 1, 2, ... around the blank), so pairs that differ only in tile
+# labels share an entry. Entries store blank moves, which do not depend on
+# labels, and are replayed on the caller's start.
+#
+# Every suffix of an optimal path is optimal, so put() also stores each
+# intermediate state with its remaining moves; a later query from any of
+# them is a hit. Entries live in a bounded in-memory LRU backed by SQLite,
+# which evicts the least recently used rows beyond max_rows.
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from utils import DATA_DIR
+from utils.puzzle_utils import pack, apply_move, board_of, to_result
+
+DEFAULT_PATH = os.path.join(DATA_DIR, 'solutions.sqlite')
+
+def canonical_key(start, goal):
+    # key of start relabelled into the canonical frame of goal
+    n = board_of(goal).n
+    blank = goal.index(0)
+    canon = list(range(1, n * n))
+    canon.insert(blank, 0)
+    label = [0] * (n * n)
+    for i, v in enumerate(goal):
+        label[v] = canon[i]
+    return f'{n}:{blank}:{pack([label[v] for v in start])}'
+
+class SolutionCache:
+    def __init__(self, path=DEFAULT_PATH, capacity=10000, max_rows=1000000):
+        # path=None keeps the cache in memory only
+        self.capacity = capacity
+        self.max_rows = max_rows
+        self._lru = OrderedDict()
+        self._db = None
+        self._rows = 0
+        if path is not None:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30)
+            self._db.execute('CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, moves TEXT NOT NULL, used REAL NOT NULL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)')
+            self._rows = self._db.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def _remember(self, key, moves):
+        self._lru[key] = moves
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def get(self, start, goal):
+        # cached optimal (path, moves) for start -> goal, or None on a miss
+        key = canonical_key(start, goal)
+        moves = self._lru.get(key)
+        if moves is not None:
+            self._lru.move_to_end(key)
+        elif self._db is not None:
+            row = self._db.execute('SELECT moves FROM solutions WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            moves = row[0]
+            self._db.execute('UPDATE solutions SET used = ? WHERE key = ?', (time.time(), key))
+            self._db.commit()
+            self._remember(key, moves)
+        else:
+            return None
+        bd = board_of(start)
+        codes = [pack(start)]
+        dirs = [int(c) for c in moves]
+        for d in dirs:
+            codes.append(apply_move(codes[-1], d, bd))
+        return to_result(codes, dirs, bd)
+
+    def put(self, start, goal, result):
+        # store an optimal (path, moves) result and every suffix of it
+        path, _ = result
+        bd = board_of(start)
+        codes = [pack(state) for state in path]
+        # recover blank moves from consecutive blank positions
+        dirs = ''.join(str(bd.delta.index((b >> bd.blank_shift) - (a >> bd.blank_shift))) for a, b in zip(codes, codes[1:]))
+        entries = [(canonical_key(state, goal), dirs[i:]) for i, state in enumerate(path)]
+        for key, moves in entries:
+            self._remember(key, moves)
+        if self._db is not None:
+            now = time.time()
+            with self._db:
+                self._db.executemany('INSERT OR REPLACE INTO solutions (key, moves, used) VALUES (?, ?, ?)',
+                                     [(key, moves, now) for key, moves in entries])
+            self._rows += len(entries)
+            if self._rows > self.max_rows:
+                self._evict()
+
+    def _evict(self):
+        # drop the least recently used rows down to 90% of max_rows
+        with self._db:
+            self._rows = self._db.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+            excess = self._rows - int(self.max_rows * 0.9)
+            if excess > 0:
+                self._db.execute('DELETE FROM solutions WHERE key IN (SELECT key FROM solutions ORDER BY used LIMIT ?)', (excess,))
+                self._rows -= excess
+
+    def solve(self, fn, start, goal, *args, **kwargs):
+        # cached answer, or fn(start, goal, ...) stored when solved; fn must be optimal
+        result = self.get(start, goal)
+        if result is None:
+            result = fn(start, goal, *args, **kwargs)
+            if result is not None:
+                self.put(start, goal, result)
+        return result
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None